@@ -0,0 +1,204 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import pygame
+from settings import asset_path
+from collision import forget_mask
+
+MAGIC = b"SSPAK1\n"
+#Bundle built by bundle.py, next to the game files
+BUNDLE_PATH = "assets.bin"
+
+# Pre-baked asset bundle
+#
+# One file holding already decoded, converted and scaled pixels for every
+# (path, size, alpha) the game loads, written by bundle.py. The file is
+# mapped rather than read, so only the pages of images that are actually
+# used get touched, and get() wraps them in a Surface without decoding.
+# Layout: MAGIC, a little-endian u32 index length, a JSON index, then the
+# pixel rows (BGRA with alpha, RGBX without).
+class AssetBundle:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            #Copy-on-write so Surfaces may wrap it, nothing goes back to the file
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        if self.map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a Space Snake asset bundle")
+        pos = len(MAGIC)
+        (length,) = struct.unpack_from("<I", self.map, pos)
+        index = json.loads(self.map[pos + 4:pos + 4 + length])
+        self.entries = {}
+        for entry in index:
+            size = tuple(entry["size"]) if entry["size"] else None
+            self.entries[(entry["path"], size, entry["alpha"])] = (entry["offset"], entry["width"], entry["height"])
+
+    def __len__(self):
+        return len(self.entries)
+
+    #Source images changed since the bundle was built
+    def stale(self):
+        built = os.path.getmtime(self.path)
+        sources = {path for path, _, _ in self.entries}
+        return sorted(path for path in sources
+                      if os.path.exists(asset_path(path)) and os.path.getmtime(asset_path(path)) > built)
+
+    def get(self, path, size=None, alpha=True):
+        entry = self.entries.get((path, size, alpha))
+        if entry is None:
+            return None
+        offset, width, height = entry
+        pixels = memoryview(self.map)[offset:offset + width * height * 4]
+        return pygame.image.frombuffer(pixels, (width, height), "BGRA" if alpha else "RGBX")
+
+# Shared surface cache
+#
+# Each (path, size, alpha) combination is loaded, converted and scaled once
+# and the same Surface is handed to every sprite and screen that asks for
+# it. Callers must treat the surfaces as read-only. Surfaces loaded before a
+# display exists are kept unconverted and converted on the next request once
+# there is a display. With a bundle open, images it holds skip decoding and
+# scaling. Collision masks are built once per (path, size) as well.
+class AssetCache:
+    def __init__(self):
+        self.bundle = None
+        self.surfaces = {}
+        self.masks = {}
+        self.converted = set()
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def __contains__(self, key):
+        return key in self.surfaces
+
+    @staticmethod
+    def surface_bytes(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    @staticmethod
+    def can_convert():
+        return pygame.display.get_init() and pygame.display.get_surface() is not None
+
+    def load(self, path, size=None, alpha=True):
+        key = (path, size, alpha)
+        surface = self.surfaces.get(key)
+        if surface is not None and (key in self.converted or not self.can_convert()):
+            self.hits += 1
+            return surface
+        self.misses += 1
+        if surface is not None:
+            self.evict_key(key)
+
+        baked = self.bundle.get(path, size, alpha) if self.bundle is not None else None
+        surface = baked or pygame.image.load(asset_path(path))
+        if self.can_convert():
+            surface = surface.convert_alpha() if alpha else surface.convert()
+            self.converted.add(key)
+        if size is not None and baked is None:
+            surface = pygame.transform.scale(surface, size)
+        self.surfaces[key] = surface
+        self.memory += self.surface_bytes(surface)
+        return surface
+
+    #Mask of an image's opaque pixels
+    def mask(self, path, size=None):
+        key = (path, size)
+        mask = self.masks.get(key)
+        if mask is None:
+            mask = pygame.mask.from_surface(self.load(path, size))
+            self.masks[key] = mask
+        return mask
+
+    def evict_key(self, key):
+        surface = self.surfaces.pop(key, None)
+        if surface is not None:
+            self.memory -= self.surface_bytes(surface)
+            self.converted.discard(key)
+
+    #Serve images from a bundle, unless it is missing or older than its sources.
+    #A PyInstaller onefile build unpacks the bundle and the images together
+    #with fresh timestamps, so the check is skipped there: both come from the
+    #same build anyway
+    def open_bundle(self, path):
+        if not os.path.exists(path):
+            return None
+        bundle = AssetBundle(path)
+        stale = [] if getattr(sys, "frozen", False) else bundle.stale()
+        if stale:
+            print(f"{path} is older than {', '.join(stale)}, run bundle.py again. Loading the PNGs instead")
+            return None
+        self.bundle = bundle
+        return bundle
+
+    #Drop every cached size of one image, or everything when path is None
+    def evict(self, path=None):
+        for key in [key for key in self.surfaces if path is None or key[0] == path]:
+            self.evict_key(key)
+        for key in [key for key in self.masks if path is None or key[0] == path]:
+            forget_mask(self.masks.pop(key))
+
+    def stats(self):
+        return {
+            "surfaces": len(self.surfaces),
+            "memory": self.memory,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+#Cache shared by every sprite and screen
+assets = AssetCache()
+
+# Pre-rotated sprite cache
+#
+# Angles are quantised to `steps` positions per full turn and each rotated
+# surface is rendered once, together with its collision mask, then shared by
+# every sprite using the same source image. Angles are rendered the first
+# time they are needed unless warm() renders the whole turn up front.
+class RotationCache:
+    def __init__(self, cache=assets, steps=360):
+        self.cache = cache
+        self.steps = steps
+        self.frames = {}
+        self.memory = 0
+
+    def __len__(self):
+        return len(self.frames)
+
+    def index(self, angle):
+        return round(angle * self.steps / 360) % self.steps
+
+    def render(self, path, size, index):
+        source = self.cache.load(path, size)
+        image = pygame.transform.rotate(source, index * 360 / self.steps)
+        frame = (image, pygame.mask.from_surface(image))
+        self.frames[(path, size, index)] = frame
+        self.memory += AssetCache.surface_bytes(image)
+        return frame
+
+    #Rotated (image, mask) for a source image
+    def get(self, path, angle, size=None):
+        index = self.index(angle)
+        frame = self.frames.get((path, size, index))
+        if frame is None:
+            frame = self.render(path, size, index)
+        return frame
+
+    def warm(self, path, size=None):
+        for index in range(self.steps):
+            if (path, size, index) not in self.frames:
+                self.render(path, size, index)
+
+    def evict(self, path=None):
+        for key in [key for key in self.frames if path is None or key[0] == path]:
+            image, mask = self.frames.pop(key)
+            self.memory -= AssetCache.surface_bytes(image)
+            forget_mask(mask)
+
+#Rotations shared by every spinning sprite
+rotations = RotationCache()
@@ -0,0 +1,145 @@
+import io
+import os
+import queue
+import random
+import threading
+import time
+import pygame
+from settings import asset_path
+
+# Background music manager
+#
+# Plays the tracks in a random order without repeating the last one. While
+# a track plays, a worker thread reads the next one into memory, and
+# update() hands it to mixer.music.queue() so it starts as soon as the
+# current one ends. The game loop itself never waits on the disk, not even
+# for the first track: start() only asks for it and update() plays it once
+# it has been read. Tracks that are missing are skipped with a warning.
+# Timings in seconds: `fetch` is the worker's read, `load` is the time the
+# game loop spent in the mixer.
+class MusicManager:
+    def __init__(self, files, endevent=pygame.USEREVENT + 1, rng=None):
+        self.files = [path for path in files if os.path.exists(asset_path(path))]
+        for path in files:
+            if path not in self.files:
+                print(f"Music file {path} not found, skipping it")
+        self.endevent = endevent
+        self.rng = rng or random.Random()
+        self.started = False
+        self.current = None
+        self.queued = None
+        self.next = None
+        #switch() was called before the next track was in memory
+        self.waiting = False
+        self.buffers = {}
+        #The mixer streams from these (current and queued track) while they play
+        self.streams = []
+        self.fetch_times = []
+        self.load_times = []
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.thread = threading.Thread(target=self.fetch_loop, name="music", daemon=True)
+        self.thread.start()
+
+    def fetch_loop(self):
+        while True:
+            path = self.requests.get()
+            if path is None:
+                break
+            start = time.perf_counter()
+            with open(asset_path(path), "rb") as f:
+                data = f.read()
+            self.results.put((path, data, time.perf_counter() - start))
+
+    #Random track other than `last`, unless it is the only one
+    def pick(self, last):
+        choices = [path for path in self.files if path != last] or self.files
+        return self.rng.choice(choices) if choices else None
+
+    def prefetch(self):
+        self.next = self.pick(self.current)
+        if self.next is not None:
+            self.requests.put(self.next)
+
+    def mixer_call(self, call, path):
+        stream = io.BytesIO(self.buffers[path])
+        start = time.perf_counter()
+        call(stream, os.path.splitext(path)[1][1:])
+        self.load_times.append(time.perf_counter() - start)
+        self.streams = self.streams[-1:] + [stream]
+
+    #Open the audio device and read the first track, update() plays it once
+    #it is in memory. The mixer is only initialised here, so it can wait
+    #until the game is on screen
+    def start(self):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        self.started = True
+        if self.next is None:
+            self.prefetch()
+
+    #Pick up finished reads, queue the next track once it is in memory
+    def update(self):
+        if not self.started:
+            return
+        while True:
+            try:
+                path, data, seconds = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.buffers[path] = data
+            self.fetch_times.append(seconds)
+        if self.next in self.buffers and self.queued is None:
+            if pygame.mixer.music.get_busy() and not self.waiting:
+                self.mixer_call(pygame.mixer.music.queue, self.next)
+                self.queued = self.next
+            else:
+                #Nothing left to queue behind or a switch is due, start it straight away
+                self.switch()
+
+    #Start the prefetched track now. If it is still being read, update()
+    #starts it as soon as it is in memory
+    def switch(self):
+        if not self.started:
+            return
+        path = self.next
+        if path not in self.buffers:
+            self.waiting = path is not None
+            return
+        self.waiting = False
+        self.mixer_call(pygame.mixer.music.load, path)
+        pygame.mixer.music.set_endevent(self.endevent)
+        pygame.mixer.music.play()
+        #Replacing a playing track posts an endevent of its own
+        pygame.event.clear(self.endevent)
+        self.current = path
+        self.queued = None
+        self.forget()
+        self.prefetch()
+
+    #The endevent: the queued track (if any) has taken over
+    def track_ended(self):
+        if self.queued is not None:
+            self.current = self.queued
+            self.queued = None
+            self.forget()
+            self.prefetch()
+
+    #Drop buffers nothing will play any more
+    def forget(self):
+        keep = (self.current, self.queued, self.next)
+        for path in list(self.buffers):
+            if path not in keep:
+                del self.buffers[path]
+
+    def stop(self):
+        if self.started:
+            pygame.mixer.music.stop()
+
+    def close(self):
+        self.requests.put(None)
+
+    def stats(self):
+        def ms(times):
+            return (sum(times) / len(times) * 1e3, max(times) * 1e3) if times else (0.0, 0.0)
+        return {"fetch": ms(self.fetch_times), "load": ms(self.load_times), "tracks": len(self.load_times)}
@@ -0,0 +1,415 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+from settings import (WIDTH, HEIGHT, SNAKE_SIZE, STAR_SIZE, DEBRIS_SIZE, OBSTACLE_SIZE, SCROLL_SPEED,
+                      get_gravity_constant, asset_path)
+from sim import KEY_VELOCITY
+
+#Discrete actions, each one key event (or none) as SpaceSnakeSim takes it:
+#nothing, W, S, A or D pressed, A/D released, W/S released
+ACTIONS = [None, (pygame.KEYDOWN, pygame.K_w), (pygame.KEYDOWN, pygame.K_s), (pygame.KEYDOWN, pygame.K_a),
+           (pygame.KEYDOWN, pygame.K_d), (pygame.KEYUP, pygame.K_a), (pygame.KEYUP, pygame.K_w)]
+#Velocity axis (0 x, 1 y, -1 none) and value per action
+ACTION_AXIS = np.array([-1] + [0 if KEY_VELOCITY[key][0] == "vel_x" else 1 for _, key in ACTIONS[1:]])
+ACTION_VALUE = np.array([0] + [KEY_VELOCITY[key][1] if event_type == pygame.KEYDOWN else 0
+                               for event_type, key in ACTIONS[1:]], dtype=float)
+
+#Slots per game, the most stars, obstacles and debris one game can hold
+CAPACITY = {"stars": 48, "obstacles": 12, "debris": 12}
+
+#Unscaled image sizes, only stars and the snake are scaled in the game
+def image_size(path):
+    return pygame.image.load(asset_path(path)).get_size()
+
+def free_slot(alive):
+    #First free slot per game, -1 where the game is full
+    slot = np.argmin(alive, axis=1)
+    return np.where(alive[np.arange(len(alive)), slot], -1, slot)
+
+#Reference Lagrange sum over the alive nodes of every game at once, see
+#lagrange.lagrange_interpolation. Factors are multiplied in log space.
+def batch_lagrange(queries, xs, ys, alive):
+    d_node = xs[:, :, None] - xs[:, None, :]
+    pair = alive[:, :, None] & alive[:, None, :] & (d_node != 0)
+    results = []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for q in queries.T:
+            d_query = q[:, None, None] - xs[:, None, :]
+            factor = np.where(pair, d_query / d_node, 1.0)
+            zero = (factor == 0).any(axis=2)
+            log_p = np.log(np.abs(factor)).sum(axis=2)
+            sign = np.where(np.count_nonzero(factor < 0, axis=2) % 2, -1.0, 1.0)
+            term = np.where(alive & ~zero, ys * sign * np.exp(log_p), 0.0)
+            results.append(term.sum(axis=1))
+    return np.stack(results, axis=1)
+
+# Batched Space Snake
+#
+# Steps `n` independent games in lockstep, with every game's state held in
+# NumPy arrays (one row per game, one column per slot) instead of sprites.
+# Gravity, movement, respawns and collisions follow SpaceSnakeSim's rules
+# (with its "circle" collisions) but run as array operations over the whole
+# batch. Games draw from their own NumPy generator, so a batch is
+# reproducible from its seed but does not replay the same sessions as
+# SpaceSnakeSim.
+#
+# reset()/step() follow the Gym vector API: step() takes one action per
+# game and returns (observations, rewards, dones, info). Finished games are
+# reset straight away and their last score is in info["final_score"].
+class BatchSim:
+    def __init__(self, n, difficulty="normal", seed=None, capacity=None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        sizes = dict(CAPACITY, **(capacity or {}))
+        difficulties = [difficulty] * n if isinstance(difficulty, str) else list(difficulty)
+        self.gravity_constant = np.array([get_gravity_constant(d) for d in difficulties])
+
+        self.debris_size = image_size("img/debris.png")
+        self.obstacle_size = image_size("img/obstacle1_l.png")
+
+        #Snake rect top left and velocity
+        self.snake = np.zeros((n, 2))
+        self.velocity = np.zeros((n, 2))
+        #Star rect top left
+        self.stars = np.zeros((n, sizes["stars"], 2))
+        self.star_alive = np.zeros((n, sizes["stars"]), dtype=bool)
+        #Obstacle center, angle and rotation speed
+        self.obstacles = np.zeros((n, sizes["obstacles"], 2))
+        self.angle = np.zeros((n, sizes["obstacles"]))
+        self.rotation_speed = np.zeros((n, sizes["obstacles"]))
+        self.obstacle_alive = np.zeros((n, sizes["obstacles"]), dtype=bool)
+        #Debris rect top left
+        self.debris = np.zeros((n, sizes["debris"], 2))
+        self.debris_alive = np.zeros((n, sizes["debris"]), dtype=bool)
+
+        self.score = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.time = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.force = np.zeros((n, 2))
+        #Adds skipped because a game had no free slot
+        self.overflow = 0
+
+        #Observation layout, one flat float32 row per game
+        self.layout = {}
+        offset = 0
+        for name, width in (("snake", 4), ("score", 2), ("stars", 3 * sizes["stars"]),
+                            ("obstacles", 4 * sizes["obstacles"]), ("debris", 3 * sizes["debris"])):
+            self.layout[name] = slice(offset, offset + width)
+            offset += width
+        self.obs_size = offset
+        self.obs = np.zeros((n, offset), dtype=np.float32)
+
+    # Start fresh games, all of them or where `mask` is set
+    def reset(self, mask=None):
+        games = np.arange(self.n) if mask is None else np.flatnonzero(mask)
+        if len(games):
+            self.snake[games] = (WIDTH // 2 - SNAKE_SIZE // 2, HEIGHT // 2 - SNAKE_SIZE // 2)
+            self.velocity[games] = 0
+            self.star_alive[games] = False
+            self.obstacle_alive[games] = False
+            self.debris_alive[games] = False
+            for _ in range(5):
+                self.respawn_stars(games, self.add(self.star_alive, games))
+            self.add_obstacles(games)
+            self.respawn_debris(games, self.add(self.debris_alive, games))
+            self.score[games] = 0
+            self.ticks[games] = 0
+            self.time[games] = 0
+            self.done[games] = False
+            self.force[games] = 0
+        return self.observe()
+
+    #Claim a slot in each of `games`, returns the slot per game (-1 when full)
+    def add(self, alive, games):
+        slots = free_slot(alive[games])
+        full = slots < 0
+        self.overflow += int(full.sum())
+        alive[games[~full], slots[~full]] = True
+        return slots
+
+    def respawn_stars(self, games, slots):
+        keep = slots >= 0
+        games, slots = games[keep], slots[keep]
+        half = STAR_SIZE // 2
+        self.stars[games, slots, 0] = self.rng.integers(WIDTH, WIDTH + STAR_SIZE, len(games), endpoint=True) - half
+        self.stars[games, slots, 1] = self.rng.integers(0, HEIGHT - STAR_SIZE, len(games), endpoint=True) - half
+
+    def respawn_debris(self, games, slots):
+        keep = slots >= 0
+        games, slots = games[keep], slots[keep]
+        w, h = self.debris_size
+        self.debris[games, slots, 0] = self.rng.integers(WIDTH, WIDTH + DEBRIS_SIZE, len(games), endpoint=True) - w // 2
+        self.debris[games, slots, 1] = self.rng.integers(0, HEIGHT - DEBRIS_SIZE, len(games), endpoint=True) - h // 2
+
+    #Random heights that avoid every star's vertical span, like LaneIndex.
+    #A few candidates are tried per obstacle, the last one is kept if all are blocked.
+    def random_y(self, games, tries=8):
+        candidates = self.rng.integers(0, HEIGHT - SNAKE_SIZE, (len(games), tries))
+        top = self.stars[games, :, 1][:, None, :] + 1
+        blocked = ((candidates[:, :, None] >= top) & (candidates[:, :, None] < top + STAR_SIZE - 1)
+                   & self.star_alive[games][:, None, :]).any(axis=2)
+        pick = np.where(blocked.all(axis=1), tries - 1, np.argmin(blocked, axis=1))
+        return candidates[np.arange(len(games)), pick]
+
+    #Back to the right edge, unrotated
+    def respawn_obstacles(self, games, slots):
+        keep = slots >= 0
+        games, slots = games[keep], slots[keep]
+        w, h = self.obstacle_size
+        self.angle[games, slots] = 0
+        self.obstacles[games, slots, 0] = WIDTH + w // 2
+        self.obstacles[games, slots, 1] = self.random_y(games) + h // 2
+
+    def add_obstacles(self, games):
+        slots = self.add(self.obstacle_alive, games)
+        keep = slots >= 0
+        self.rotation_speed[games[keep], slots[keep]] = self.rng.uniform(-0.1, 0.1, int(keep.sum()))
+        self.respawn_obstacles(games, slots)
+
+    #Half the rotated obstacle's bounding box
+    def obstacle_half_extent(self):
+        w, h = self.obstacle_size
+        radians = np.radians(self.angle)
+        cos, sin = np.abs(np.cos(radians)), np.abs(np.sin(radians))
+        return (w * cos + h * sin) / 2, (w * sin + h * cos) / 2
+
+    def apply_actions(self, actions):
+        actions = np.asarray(actions)
+        axis = ACTION_AXIS[actions]
+        pressed = axis >= 0
+        games = np.flatnonzero(pressed)
+        self.velocity[games, axis[pressed]] = ACTION_VALUE[actions[pressed]]
+
+    def apply_gravity(self, playing):
+        #Data points, the snake plus every star
+        xs = np.concatenate([self.snake[:, None, 0], self.stars[:, :, 0]], axis=1)
+        ys = np.concatenate([self.snake[:, None, 1], self.stars[:, :, 1]], axis=1)
+        alive = np.concatenate([np.ones((self.n, 1), dtype=bool), self.star_alive], axis=1)
+        #Only the slots some game uses
+        used = alive.any(axis=0)
+        used = len(used) - np.argmax(used[::-1])
+        result = batch_lagrange(self.snake, xs[:, :used], ys[:, :used], alive[:, :used])
+        self.force = self.gravity_constant[:, None] * result
+        self.velocity[playing] += self.force[playing]
+
+    def collect_stars(self, playing):
+        x, y = self.snake[:, None, 0], self.snake[:, None, 1]
+        sx, sy = self.stars[:, :, 0], self.stars[:, :, 1]
+        hits = (self.star_alive & playing[:, None] & (x < sx + STAR_SIZE) & (sx < x + SNAKE_SIZE)
+                & (y < sy + STAR_SIZE) & (sy < y + SNAKE_SIZE))
+        self.star_alive &= ~hits
+        games = np.flatnonzero(hits.any(axis=1))
+        if not len(games):
+            return
+        self.score[games] += 1
+        score = self.score[games]
+
+        #Every 30 points, 3 extra stars start in the top left corner
+        extra = games[score % 30 == 0]
+        for _ in range(3):
+            slots = self.add(self.star_alive, extra)
+            self.stars[extra[slots >= 0], slots[slots >= 0]] = 0
+
+        slots = self.add(self.star_alive, games)
+        self.respawn_stars(games, slots)
+        self.stars[games[slots >= 0], slots[slots >= 0], 0] -= SCROLL_SPEED
+
+        #Every 25 points a new obstacle, and every obstacle moves away from the stars
+        more = games[score % 25 == 0]
+        if len(more):
+            self.add_obstacles(more)
+            rows, slots = np.nonzero(self.obstacle_alive[more])
+            _, h = self.obstacle_half_extent()
+            self.obstacles[more[rows], slots, 1] = self.random_y(more[rows]) + h[more[rows], slots].astype(int)
+
+        #Every 20 points a new piece of debris
+        more = games[score % 20 == 0]
+        self.respawn_debris(more, self.add(self.debris_alive, more))
+
+    def check_hazards(self, playing):
+        center = self.snake + SNAKE_SIZE // 2
+        reach = SNAKE_SIZE // 2 + OBSTACLE_SIZE // 2
+        d = np.rint(self.obstacles) - center[:, None, :]
+        hit = (self.obstacle_alive & ((d ** 2).sum(axis=2) <= reach ** 2)).any(axis=1)
+        self.done |= hit & playing
+
+        w, h = self.debris_size
+        reach = SNAKE_SIZE // 2 + DEBRIS_SIZE // 2
+        d = self.debris + (w // 2, h // 2) - center[:, None, :]
+        hits = self.debris_alive & playing[:, None] & ((d ** 2).sum(axis=2) <= reach ** 2)
+        games = hits.any(axis=1)
+        self.score[games] -= 1
+        self.done |= games & (self.score < 0)
+        rows, slots = np.nonzero(hits)
+        self.respawn_debris(rows, slots)
+
+    def move(self):
+        #Snake, within screen bounds
+        self.snake[:, 0] = np.trunc(np.clip(self.snake[:, 0] + self.velocity[:, 0], 0, WIDTH - SNAKE_SIZE))
+        self.snake[:, 1] = np.trunc(np.clip(self.snake[:, 1] + self.velocity[:, 1], 0, HEIGHT - SNAKE_SIZE))
+
+        #Everything else scrolls left and respawns once off screen
+        self.stars[:, :, 0] -= SCROLL_SPEED
+        rows, slots = np.nonzero(self.star_alive & (self.stars[:, :, 0] + STAR_SIZE < 0))
+        self.respawn_stars(rows, slots)
+
+        self.obstacles[:, :, 0] -= SCROLL_SPEED
+        self.angle += self.rotation_speed
+        w, _ = self.obstacle_half_extent()
+        rows, slots = np.nonzero(self.obstacle_alive & (self.obstacles[:, :, 0] + w < 0))
+        self.respawn_obstacles(rows, slots)
+
+        self.debris[:, :, 0] -= SCROLL_SPEED
+        rows, slots = np.nonzero(self.debris_alive & (self.debris[:, :, 0] + self.debris_size[0] < 0))
+        self.respawn_debris(rows, slots)
+
+    def step(self, actions):
+        playing = ~self.done
+        before = self.score.copy()
+        self.apply_actions(actions)
+        self.apply_gravity(playing)
+        self.collect_stars(playing)
+        self.check_hazards(playing)
+
+        still = playing & ~self.done
+        self.ticks[still] += 1
+        self.time = np.where(self.ticks > 100, self.ticks // 100, 0)
+        self.move()
+
+        rewards = (self.score - before).astype(np.float32)
+        dones = self.done.copy()
+        final_score = np.where(dones, self.score, -1)
+        if dones.any():
+            self.reset(dones)
+        return self.observe(), rewards, dones, {"final_score": final_score}
+
+    def observe(self):
+        obs, layout = self.obs, self.layout
+        obs[:, layout["snake"]] = np.concatenate([self.snake, self.velocity], axis=1)
+        obs[:, layout["score"]] = np.stack([self.score, self.time], axis=1)
+        obs[:, layout["stars"]] = np.concatenate(
+            [self.stars, self.star_alive[:, :, None]], axis=2).reshape(self.n, -1)
+        obs[:, layout["obstacles"]] = np.concatenate(
+            [self.obstacles, self.angle[:, :, None], self.obstacle_alive[:, :, None]], axis=2).reshape(self.n, -1)
+        obs[:, layout["debris"]] = np.concatenate(
+            [self.debris, self.debris_alive[:, :, None]], axis=2).reshape(self.n, -1)
+        return obs
+
+#Process pool worker, steps its slice of the games inside the shared buffers
+def batch_worker(conn, names, shapes, start, stop, difficulty, seed, capacity):
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    actions, obs, rewards, dones, final_score = [
+        np.ndarray(shape, dtype=dtype, buffer=block.buf)[start:stop]
+        for block, (shape, dtype) in zip(blocks, shapes)]
+    sim = BatchSim(stop - start, difficulty, seed, capacity)
+    while True:
+        command = conn.recv()
+        if command == "reset":
+            obs[:] = sim.reset()
+        elif command == "step":
+            obs[:], rewards[:], dones[:], info = sim.step(actions)
+            final_score[:] = info["final_score"]
+        else:
+            break
+        conn.send(sim.overflow)
+    del actions, obs, rewards, dones, final_score
+    for block in blocks:
+        block.close()
+    conn.close()
+
+# BatchSim fanned out over worker processes
+#
+# Actions, observations, rewards, dones and final scores live in shared
+# memory. Each worker owns a contiguous slice of the games and writes its
+# results straight into it, so a step only sends one short command per
+# worker. The arrays returned by reset()/step() are views of the shared
+# buffers and are overwritten by the next call. If a worker dies, the call
+# that finds out closes everything, shared memory included, and re-raises.
+class ParallelBatchSim:
+    def __init__(self, n, workers=None, difficulty="normal", seed=None, capacity=None):
+        workers = min(n, workers or multiprocessing.cpu_count())
+        self.n = n
+        obs_size = BatchSim(1, capacity=capacity).obs_size
+        shapes = [((n,), np.int64), ((n, obs_size), np.float32), ((n,), np.float32),
+                  ((n,), bool), ((n,), np.int64)]
+        self.blocks = [shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+                       for shape, dtype in shapes]
+        self.actions, self.obs, self.rewards, self.dones, self.final_score = [
+            np.ndarray(shape, dtype=dtype, buffer=block.buf) for block, (shape, dtype) in zip(self.blocks, shapes)]
+        self.actions[:] = 0
+
+        #Independent streams per worker, reproducible from the one seed
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        bounds = np.linspace(0, n, workers + 1).astype(int)
+        names = [block.name for block in self.blocks]
+        self.conns = []
+        self.processes = []
+        self.overflow = 0
+        try:
+            for i in range(workers):
+                start, stop = bounds[i], bounds[i + 1]
+                difficulties = difficulty if isinstance(difficulty, str) else list(difficulty)[start:stop]
+                conn, child = multiprocessing.Pipe()
+                process = multiprocessing.Process(
+                    target=batch_worker, daemon=True,
+                    args=(child, names, shapes, start, stop, difficulties, seeds[i], capacity))
+                process.start()
+                self.conns.append(conn)
+                self.processes.append(process)
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def send(self, command):
+        try:
+            for conn in self.conns:
+                conn.send(command)
+            self.overflow = sum(conn.recv() for conn in self.conns)
+        except BaseException:
+            self.close()
+            raise
+
+    def reset(self):
+        self.send("reset")
+        return self.obs
+
+    def step(self, actions):
+        self.actions[:] = actions
+        self.send("step")
+        return self.obs, self.rewards, self.dones, {"final_score": self.final_score}
+
+    #Workers that don't stop within `timeout` seconds are terminated
+    def close(self, timeout=5):
+        if not self.blocks:
+            return
+        for conn in self.conns:
+            try:
+                conn.send("close")
+            except OSError:
+                pass
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for conn in self.conns:
+            conn.close()
+        self.conns = []
+        self.processes = []
+        del self.actions, self.obs, self.rewards, self.dones, self.final_score
+        for block in self.blocks:
+            block.unlink()
+            try:
+                block.close()
+            except BufferError:
+                #Arrays handed out by reset()/step() still map it, it goes with them
+                pass
+        self.blocks = []
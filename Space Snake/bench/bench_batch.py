@@ -0,0 +1,61 @@
+#Throughput of the batched simulation against stepping SpaceSnakeSims one by one
+#Run from the "Space Snake" folder: python bench/bench_batch.py [ticks]
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from settings import use_dummy_drivers
+use_dummy_drivers()
+
+from sim import SpaceSnakeSim
+from batch import ACTIONS, BatchSim, ParallelBatchSim
+
+BATCH_SIZES = [16, 256, 1024]
+
+#Random actions, a key event roughly every 20 ticks
+def random_actions(rng, n):
+    return np.where(rng.random(n) < 0.05, rng.integers(1, len(ACTIONS), n), 0)
+
+def run_sims(n, ticks):
+    rng = np.random.default_rng(0)
+    sims = [SpaceSnakeSim(seed=i) for i in range(n)]
+    scores = []
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for sim, action in zip(sims, random_actions(rng, n)):
+            sim.step([ACTIONS[action]] if action else [])
+            if not sim.playing:
+                scores.append(sim.score)
+                sim.reset(seed=len(scores) + n)
+    return time.perf_counter() - start, scores
+
+def run_batch(env, n, ticks):
+    rng = np.random.default_rng(0)
+    scores = []
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        obs, rewards, dones, info = env.step(random_actions(rng, n))
+        scores += list(info["final_score"][dones])
+    return time.perf_counter() - start, scores
+
+def report(name, n, ticks, elapsed, scores):
+    mean = f"{np.mean(scores):6.2f}" if scores else "     -"
+    print(f"{name:>9} n={n:<5} {n * ticks / elapsed:10.0f} game ticks/s  "
+          f"{len(scores):6d} games over, mean final score {mean}")
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    for n in BATCH_SIZES:
+        #The sprite version is only timed on a slice, it scales linearly
+        sprite_n = min(n, 64)
+        report("sprites", sprite_n, ticks, *run_sims(sprite_n, ticks))
+        report("batch", n, ticks, *run_batch(BatchSim(n, seed=0), n, ticks))
+        with ParallelBatchSim(n, seed=0) as env:
+            report("parallel", n, ticks, *run_batch(env, n, ticks))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#Snake collision queries, linear spritecollide scans vs the spatial hash
+#Run from the "Space Snake" folder: python bench/bench_collision.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from settings import use_dummy_drivers
+use_dummy_drivers()
+
+import pygame
+from sim import SpaceSnakeSim
+from scenes import populate
+
+ENTITY_COUNTS = [10, 50, 100, 250, 500, 1000, 2000]
+TICKS = 200
+
+def linear(sim):
+    collide_circle = pygame.sprite.collide_circle
+    return (pygame.sprite.spritecollide(sim.snake, sim.stars, False),
+            pygame.sprite.spritecollide(sim.snake, sim.obstacles, False, collide_circle),
+            pygame.sprite.spritecollide(sim.snake, sim.debris, False, collide_circle))
+
+def hashed(sim):
+    collide_circle = pygame.sprite.collide_circle
+    return (sim.grid.collide(sim.snake, sim.stars),
+            sim.grid.collide(sim.snake, sim.obstacles, False, collide_circle),
+            sim.grid.collide(sim.snake, sim.debris, False, collide_circle))
+
+#A session with `count` entities, a third of each kind
+def crowded(count):
+    sim = SpaceSnakeSim("easy", seed=count)
+    #Keep the snake alive so the session runs for every tick
+    sim.check_hazards = lambda: None
+    return populate(sim, count // 3, count // 3, count // 3)
+
+def main():
+    print(f"{'entities':>8} {'linear':>10} {'hash':>10} {'speedup':>8} {'hits':>6}")
+    for count in ENTITY_COUNTS:
+        sim = crowded(count)
+        t_linear = t_hash = 0
+        hits = 0
+        for tick in range(TICKS):
+            sim.snake.vel_x = 4 if tick % 100 < 50 else -4
+            sim.snake.vel_y = 2 if tick % 60 < 30 else -2
+            sim.step()
+            #The linear scan reads every rect
+            sim.sync()
+            start = time.perf_counter()
+            expected = linear(sim)
+            t_linear += time.perf_counter() - start
+            start = time.perf_counter()
+            result = hashed(sim)
+            t_hash += time.perf_counter() - start
+            assert result == expected, (tick, expected, result)
+            hits += sum(map(len, result))
+        print(f"{count:>8} {t_linear / TICKS * 1e6:>8.1f}us {t_hash / TICKS * 1e6:>8.1f}us "
+              f"{t_linear / t_hash:>7.1f}x {hits:>6}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#Micro-benchmark: cached gravity field vs direct Lagrange evaluation
+#Run from the "Space Snake" folder: python bench/bench_field.py
+#
+#Fails if the field at its default cell size is off by more than
+#FIELD_TOLERANCE of the strongest field on the playfield.
+import os
+import sys
+import random
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from settings import WIDTH, HEIGHT, STAR_SIZE
+from lagrange import BarycentricInterpolator
+from field import GravityField, CELL, FIELD_TOLERANCE
+
+#Star counts the game reaches, plus the snake as one more node
+NODE_COUNTS = [6, 12, 24]
+CELLS = [2, CELL, 10, 25]
+ENTITY_COUNTS = [1, 10, 100, 1000]
+ACCURACY_POINTS = 5000
+REPEAT = 5
+
+def make_nodes(rng, n):
+    nodes = {"snake": (rng.randint(0, WIDTH - 80), rng.randint(0, HEIGHT - 80))}
+    for i in range(n):
+        nodes[i] = (rng.randint(-STAR_SIZE, WIDTH + STAR_SIZE), rng.randint(0, HEIGHT - STAR_SIZE))
+    return nodes
+
+def best(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=REPEAT)) / number
+
+def direct(interpolator, xs, ys):
+    return interpolator.evaluate(xs), interpolator.evaluate(ys)
+
+def main():
+    rng = random.Random(0)
+    points = np.random.default_rng(0)
+    xs = points.uniform(0, WIDTH, ACCURACY_POINTS)
+    ys = points.uniform(0, HEIGHT, ACCURACY_POINTS)
+
+    #Errors relative to the strongest field on screen, the scale gravity acts at
+    print("accuracy against direct evaluation, error / max |field| on the playfield")
+    print(f"{'nodes':>6} {'cell':>5} {'median':>10} {'p99':>10} {'max':>10} {'build':>10}")
+    for n in NODE_COUNTS:
+        interpolator = BarycentricInterpolator(span=WIDTH + 2 * STAR_SIZE)
+        interpolator.sync(make_nodes(rng, n))
+        exact_x, exact_y = direct(interpolator, xs, ys)
+        scale_x, scale_y = np.abs(exact_x).max(), np.abs(exact_y).max()
+        for cell in CELLS:
+            field = GravityField(interpolator, cell)
+            field.update()
+            fx, fy = field.sample(xs, ys)
+            error = np.maximum(np.abs(fx - exact_x) / scale_x, np.abs(fy - exact_y) / scale_y)
+            def rebuild():
+                field.version = None
+                field.update()
+            t_build = best(rebuild, 200)
+            print(f"{n + 1:>6} {cell:>5} {np.median(error):>10.2e} {np.percentile(error, 99):>10.2e} "
+                  f"{error.max():>10.2e} {t_build * 1e6:>8.1f}us")
+            if cell <= CELL:
+                assert error.max() < FIELD_TOLERANCE, (n + 1, cell, error.max())
+
+    print()
+    print("cost per entity, field already built")
+    print(f"{'nodes':>6} {'entities':>9} {'direct':>12} {'field':>12} {'speedup':>8}")
+    for n in NODE_COUNTS:
+        interpolator = BarycentricInterpolator(span=WIDTH + 2 * STAR_SIZE)
+        interpolator.sync(make_nodes(rng, n))
+        field = GravityField(interpolator)
+        field.update()
+        for count in ENTITY_COUNTS:
+            ex, ey = xs[:count], ys[:count]
+            number = max(10, 20000 // count)
+            t_direct = best(lambda: direct(interpolator, ex, ey), number) / count
+            t_field = best(lambda: field.sample(ex, ey), number) / count
+            print(f"{n + 1:>6} {count:>9} {t_direct * 1e6:>10.3f}us {t_field * 1e6:>10.3f}us "
+                  f"{t_direct / t_field:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
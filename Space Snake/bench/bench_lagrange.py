@@ -0,0 +1,84 @@
+#Micro-benchmark: reference Lagrange vs barycentric engine
+#Run from the "Space Snake" folder: python bench/bench_lagrange.py
+#
+#"frame" is the engine as the game uses it (the reference loop below
+#DIRECT_NODES distinct x values), "weights" always keeps barycentric weights.
+#Fails if either is off from exact rational evaluation by more than TOLERANCE.
+import os
+import sys
+import random
+import timeit
+from fractions import Fraction
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lagrange import lagrange_interpolation, BarycentricInterpolator, DIRECT_NODES
+
+NODE_COUNTS = [5, 10, 20, 25, 50, 100, 250, 500]
+REPEAT = 5
+#Largest error against exact rational evaluation the engine may make
+TOLERANCE = 1e-6
+
+#Star positions collide on x now and then, `duplicates` nodes reuse an x
+def make_nodes(rng, n, duplicates=0):
+    xs = rng.sample(range(-2 * n, 1600 + 2 * n), n - duplicates)
+    xs += [rng.choice(xs) for _ in range(duplicates)]
+    return {i: (x, rng.randint(0, 520)) for i, x in enumerate(xs)}
+
+def rel_error(value, exact):
+    return abs(value - exact) / max(1.0, abs(exact))
+
+def best(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=REPEAT)) / number
+
+#Time of a typical frame: every star scrolls by -5, the snake moves on its own
+def frame_time(engine, nodes, number):
+    frame_nodes = dict(nodes)
+    engine.sync(frame_nodes)
+    def frame():
+        for key, (x, y) in frame_nodes.items():
+            frame_nodes[key] = (x - 5, y)
+        x, y = frame_nodes[0]
+        frame_nodes[0] = (x + 9, y + 1)
+        engine.sync(frame_nodes)
+        engine.evaluate(frame_nodes[0])
+    return best(frame, number)
+
+def main():
+    rng = random.Random(0)
+    print(f"{'nodes':>6} {'dups':>5} {'reference':>12} {'rebuild':>12} {'frame':>12} {'weights':>12} "
+          f"{'ref err':>10} {'engine err':>10}")
+    for n, duplicates in [(n, duplicates) for n in NODE_COUNTS for duplicates in (0, n // 4)]:
+        nodes = make_nodes(rng, n, duplicates)
+        points = list(nodes.values())
+        query = (nodes[0][0] + 0.5, nodes[0][1] + 0.5)
+
+        #Exact rational evaluation to judge both float versions against
+        exact_points = [(Fraction(x), Fraction(y)) for x, y in points]
+        exact = [float(lagrange_interpolation(Fraction(q), exact_points)) for q in query]
+        reference = [lagrange_interpolation(q, points) for q in query]
+        ref_error = max(rel_error(r, e) for r, e in zip(reference, exact))
+        engine_error = 0.0
+        for direct_nodes in (DIRECT_NODES, 0):
+            engine = BarycentricInterpolator(direct_nodes=direct_nodes)
+            engine.sync(nodes)
+            result = engine.evaluate(query)
+            engine_error = max(engine_error, max(rel_error(r, e) for r, e in zip(result, exact)))
+        assert engine_error < TOLERANCE, (n, duplicates, engine_error)
+
+        number = max(1, 2000 // n)
+        t_ref = best(lambda: [lagrange_interpolation(q, points) for q in query], max(1, number // n + 1))
+
+        def rebuild():
+            fresh = BarycentricInterpolator()
+            fresh.sync(nodes)
+            fresh.evaluate(query)
+        t_build = best(rebuild, number)
+        t_frame = frame_time(BarycentricInterpolator(), nodes, number)
+        t_weights = frame_time(BarycentricInterpolator(direct_nodes=0), nodes, number)
+
+        print(f"{n:>6} {duplicates:>5} {t_ref * 1e6:>10.1f}us {t_build * 1e6:>10.1f}us {t_frame * 1e6:>10.1f}us "
+              f"{t_weights * 1e6:>10.1f}us {ref_error:>10.1e} {engine_error:>10.1e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#Narrow phase benchmark: the original rects and circles vs exact masks
+#
+#Times the snake's three collision queries per tick (stars, obstacles,
+#debris) in crowded sessions, counts how far candidate pairs get through
+#the mask narrow phase, and how often the circle test disagrees with the
+#pixels. "masks/frame" builds the masks from the images on every test,
+#what caching them avoids.
+#Run from the "Space Snake" folder: python bench/bench_masks.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from settings import use_dummy_drivers
+use_dummy_drivers()
+
+import pygame
+from collision import COLLISION_MODES, circles_touch, masks_overlap
+from bench_collision import crowded
+
+ENTITY_COUNTS = [10, 100, 1000, 2000]
+TICKS = 200
+#Each query is timed this many times per tick, the fastest counts
+REPEAT = 5
+
+#The mask narrow phase with a counter per stage
+class Stages:
+    def __init__(self):
+        self.pairs = self.rect = self.circle = self.hits = 0
+
+    def __call__(self, a, b):
+        self.pairs += 1
+        if not a.rect.colliderect(b.rect):
+            return False
+        self.rect += 1
+        if not circles_touch(a, b):
+            return False
+        self.circle += 1
+        hit = masks_overlap(a, b)
+        self.hits += hit
+        return hit
+
+def uncached(a, b):
+    offset = (b.rect.x - a.rect.x, b.rect.y - a.rect.y)
+    return pygame.mask.from_surface(a.image).overlap(pygame.mask.from_surface(b.image), offset) is not None
+
+def queries(sim, colliders):
+    grid, snake = sim.grid, sim.snake
+    return [grid.collide(snake, group, False, collided)
+            for group, collided in zip((sim.stars, sim.obstacles, sim.debris), colliders)]
+
+def main():
+    modes = {"circle": COLLISION_MODES["circle"], "mask": COLLISION_MODES["mask"],
+             "masks/frame": (uncached,) * 3}
+    print(f"{'entities':>8} " + " ".join(f"{mode:>12}" for mode in modes) +
+          f" {'pairs':>7} {'rect':>6} {'circle':>6} {'hits':>5} {'circle wrong':>12}")
+    for count in ENTITY_COUNTS:
+        sim = crowded(count)
+        times = dict.fromkeys(modes, 0.0)
+        stages = Stages()
+        wrong = 0
+        for tick in range(TICKS):
+            sim.snake.vel_x = 4 if tick % 100 < 50 else -4
+            sim.snake.vel_y = 2 if tick % 60 < 30 else -2
+            sim.step()
+            sim.sync()
+            #Counting first also works out the radius of any new rotation before the timing
+            counted = queries(sim, (stages,) * 3)
+            results = {}
+            for mode, colliders in modes.items():
+                best = None
+                for _ in range(REPEAT):
+                    start = time.perf_counter()
+                    results[mode] = queries(sim, colliders)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                times[mode] += best
+            assert results["mask"] == results["masks/frame"], tick
+            assert counted == results["mask"], tick
+            wrong += sum(len(set(a) ^ set(b)) for a, b in zip(results["circle"], results["mask"]))
+        print(f"{count:>8} " + " ".join(f"{times[mode] / TICKS * 1e6:>10.1f}us" for mode in modes) +
+              f" {stages.pairs:>7} {stages.rect:>6} {stages.circle:>6} {stages.hits:>5} {wrong:>12}")
+
+if __name__ == "__main__":
+    main()
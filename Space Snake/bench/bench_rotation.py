@@ -0,0 +1,56 @@
+#Per-frame obstacle update cost, rotating every frame vs the rotation cache
+#Run from the "Space Snake" folder: python bench/bench_rotation.py
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from settings import use_dummy_drivers, WIDTH, HEIGHT, SNAKE_SIZE
+use_dummy_drivers()
+
+import pygame
+from assets import assets, rotations
+from sprites import Obstacle
+from lanes import LaneIndex
+
+OBSTACLE_COUNTS = [1, 5, 25, 100, 250, 500]
+FRAMES = 120
+
+#The old update, one transform.rotate per obstacle per frame
+def rotate_every_frame(obstacle):
+    obstacle.rect.x -= 5
+    obstacle.angle += obstacle.rotation_speed
+    obstacle.image = pygame.transform.rotate(obstacle.original_image, obstacle.angle)
+    obstacle.rect = obstacle.image.get_rect(center=obstacle.rect.center)
+
+def run(obstacles, update):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        for obstacle in obstacles:
+            update(obstacle)
+    return (time.perf_counter() - start) / FRAMES
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    rng = random.Random(0)
+    lanes = LaneIndex(0, HEIGHT - SNAKE_SIZE)
+    rotations.warm(Obstacle.image_path)
+    print(f"{'obstacles':>9} {'rotate':>12} {'cached':>12} {'per obstacle':>14}")
+    for count in OBSTACLE_COUNTS:
+        obstacles = [Obstacle(rng, lanes) for _ in range(count)]
+        for obstacle in obstacles:
+            obstacle.spawn()
+            obstacle.original_image = assets.load(Obstacle.image_path)
+            obstacle.rotation_speed = rng.uniform(-3, 3)
+        t_rotate = run(obstacles, rotate_every_frame)
+        for obstacle in obstacles:
+            obstacle.reset_position()
+        t_cached = run(obstacles, Obstacle.update)
+        print(f"{count:>9} {t_rotate * 1e3:>10.3f}ms {t_cached * 1e3:>10.3f}ms {t_cached / count * 1e6:>12.2f}us")
+    print(f"rotation cache: {len(rotations)} frames, {rotations.memory / 2 ** 20:.1f} MiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#Headless throughput of the simulation core
+#Run from the "Space Snake" folder: python bench/bench_sim.py [seconds]
+#
+#About 20k ticks/s and 20 sessions/s per difficulty on one core, sessions
+#end at game over or MAX_TICKS. bench_batch.py measures the batched sim.
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from settings import use_dummy_drivers
+use_dummy_drivers()
+
+import pygame
+from sim import SpaceSnakeSim
+
+MAX_TICKS = 3600
+MOVE_KEYS = [pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d]
+
+#Random key presses, a new key roughly every 20 ticks
+def random_actions(rng):
+    if rng.random() < 0.05:
+        event_type = rng.choice([pygame.KEYDOWN, pygame.KEYUP])
+        return [(event_type, rng.choice(MOVE_KEYS))]
+    return []
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    for difficulty in ["easy", "normal", "hard"]:
+        rng = random.Random(0)
+        sim = SpaceSnakeSim(difficulty, seed=0)
+        sessions = ticks = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            sim.step(random_actions(rng))
+            ticks += 1
+            if not sim.playing or sim.ticks >= MAX_TICKS:
+                sessions += 1
+                sim.reset(seed=sessions)
+        elapsed = time.perf_counter() - start
+        print(f"{difficulty:>7}: {ticks / elapsed:10.0f} ticks/s {sessions / elapsed:8.1f} sessions/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#Spawn scheduler benchmark: time spent spawning per tick and the work left
+#waiting, per wave profile and per-tick budget. Scoring is forced every
+#`--score-every` ticks so every wave of the profile comes up.
+#Run from the "Space Snake" folder: python bench/bench_spawn.py
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from settings import use_dummy_drivers, GAME_STATE_PLAYING
+use_dummy_drivers()
+
+import pygame
+from sim import SpaceSnakeSim
+from waves import WAVE_PROFILES
+from frametime import FrameClock, percentile
+from scenes import scripted_actions
+
+BUDGETS = [4, 16, 64, 0]
+
+def run(profile, budget, ticks, score_every):
+    sim = SpaceSnakeSim("normal", seed=0, waves=profile, spawn_budget=budget)
+    clock = FrameClock()
+    spawn, total, deferred = [], [], []
+    for tick in range(ticks):
+        if score_every and tick % score_every == 0:
+            sim.score += 1
+            sim.spawner.wave(sim.score)
+        clock.start()
+        sim.step(scripted_actions(tick), clock)
+        sim.state = GAME_STATE_PLAYING
+        times = clock.stop()
+        spawn.append(times.get("spawn", 0))
+        total.append(times["total"])
+        deferred.append(sim.spawner.deferred)
+    return spawn, total, deferred, len(sim.entities)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Space Snake spawn scheduler benchmark")
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--score-every", type=int, default=10, help="force a point every N ticks (0: never)")
+    parser.add_argument("--profiles", nargs="*", choices=sorted(WAVE_PROFILES), default=["normal", "stress-1000", "stress-5000"])
+    args = parser.parse_args(argv)
+
+    pygame.display.init()
+    print(f"{'profile':>12} {'budget':>6} {'spawn p50/p99/max':>24} {'tick p99/max':>16} "
+          f"{'deferred mean/max':>18} {'entities':>9}")
+    for profile in args.profiles:
+        for budget in BUDGETS:
+            spawn, total, deferred, entities = run(profile, budget, args.ticks, args.score_every)
+            print(f"{profile:>12} {budget or '-':>6} "
+                  f"{percentile(spawn, 50) * 1e3:>6.3f}/{percentile(spawn, 99) * 1e3:>6.3f}/{max(spawn) * 1e3:>6.2f}ms "
+                  f"{percentile(total, 99) * 1e3:>6.2f}/{max(total) * 1e3:>6.2f}ms "
+                  f"{sum(deferred) / len(deferred):>9.1f}/{max(deferred):>7} {entities:>9}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#Frame-time benchmark suite
+#
+#Drives the game headlessly (SDL dummy drivers) with scripted W/A/S/D input
+#across entity counts and difficulties, and reports p50/p95/p99 frame time
+#per phase. Run from the "Space Snake" folder:
+#
+#    python bench/frametime.py --out results.json
+#    python bench/frametime.py --compare results.json
+#
+#Pass --backend texture to run the same scenes on the GPU texture renderer
+#and compare it against a surface run.
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from settings import use_dummy_drivers, GAME_STATE_PLAYING
+use_dummy_drivers()
+
+import pygame
+from sim import SpaceSnakeSim
+from render import BACKENDS, open_window, make_renderer
+from hud import TextCache, Hud
+from assets import assets
+from scenes import populate, scripted_actions
+
+DIFFICULTIES = ["easy", "normal", "hard"]
+
+#Extra (stars, obstacles, debris) on top of a fresh session
+SCENES = {
+    "base": (0, 0, 0),
+    "stars-25": (25, 0, 0),
+    "stars-100": (100, 0, 0),
+    "stars-250": (250, 0, 0),
+    "obstacles-10": (0, 10, 0),
+    "obstacles-50": (0, 50, 0),
+    "obstacles-200": (0, 200, 0),
+    "obstacles-2000": (0, 2000, 0),
+    "debris-10": (0, 0, 10),
+    "debris-50": (0, 0, 50),
+    "debris-200": (0, 0, 200),
+    "debris-2000": (0, 0, 2000),
+    "mixed": (100, 50, 50),
+    "mixed-x10": (1000, 500, 500),
+}
+
+PHASES = ["gravity", "collision", "spawn", "update", "render", "total"]
+
+#Collects per-phase times for one frame
+class FrameClock:
+    def __init__(self):
+        self.times = {}
+        self.last = time.perf_counter()
+
+    def start(self):
+        self.times = {}
+        self.first = self.last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.times[phase] = self.times.get(phase, 0) + now - self.last
+        self.last = now
+
+    def stop(self):
+        self.times["total"] = self.last - self.first
+        return self.times
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+def summarize(samples):
+    return {
+        "p50": percentile(samples, 50) * 1e3,
+        "p95": percentile(samples, 95) * 1e3,
+        "p99": percentile(samples, 99) * 1e3,
+        "mean": sum(samples) / len(samples) * 1e3,
+    }
+
+def run_scene(renderer, hud, difficulty, counts, frames, render=True):
+    sim = SpaceSnakeSim(difficulty, seed=0)
+    populate(sim, *counts)
+    clock = FrameClock()
+    samples = {phase: [] for phase in PHASES}
+    for tick in range(frames):
+        clock.start()
+        sim.step(scripted_actions(tick), clock)
+        #Keep playing through hits so every frame does the full amount of work
+        sim.state = GAME_STATE_PLAYING
+        if render:
+            renderer.background()
+            sim.sync()
+            renderer.group(sim.all_sprites)
+            hud.draw(renderer, sim.score, sim.time)
+            renderer.present()
+        clock.mark("render")
+        for phase, value in clock.stop().items():
+            samples[phase].append(value)
+    return {phase: summarize(values) for phase, values in samples.items()}
+
+def compare(results, baseline, threshold):
+    old = {(r["scene"], r["difficulty"]): r for r in baseline["results"]}
+    regressions = 0
+    print(f"\n{'scene':>14} {'difficulty':>10} {'old p95':>9} {'new p95':>9} {'change':>8}")
+    for result in results["results"]:
+        key = (result["scene"], result["difficulty"])
+        if key not in old:
+            continue
+        before = old[key]["phases"]["total"]["p95"]
+        after = result["phases"]["total"]["p95"]
+        change = after / before - 1 if before else 0
+        flag = " REGRESSION" if change > threshold else ""
+        regressions += bool(flag)
+        print(f"{key[0]:>14} {key[1]:>10} {before:>7.2f}ms {after:>7.2f}ms {change:>+7.1%}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Space Snake frame-time benchmark")
+    parser.add_argument("--frames", type=int, default=300, help="frames per scene")
+    parser.add_argument("--scenes", nargs="*", choices=sorted(SCENES), help="scenes to run (default: all)")
+    parser.add_argument("--difficulties", nargs="*", choices=DIFFICULTIES, default=DIFFICULTIES)
+    parser.add_argument("--no-render", action="store_true", help="only time the simulation")
+    parser.add_argument("--backend", choices=BACKENDS, default="surface", help="renderer to draw with")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to compare total p95 against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="p95 slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    window = open_window(args.backend)
+    renderer = make_renderer(window, assets.load("img/bg2.png", alpha=False), args.backend)
+    hud = Hud(TextCache(pygame.font.Font(None, 36)))
+
+    results = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "frames": args.frames,
+            "render": not args.no_render,
+            "backend": args.backend,
+        },
+        "results": [],
+    }
+    print(f"{'scene':>14} {'difficulty':>10} " + " ".join(f"{phase + ' p50/p95/p99':>24}" for phase in PHASES))
+    for scene in args.scenes or SCENES:
+        for difficulty in args.difficulties:
+            phases = run_scene(renderer, hud, difficulty, SCENES[scene], args.frames, not args.no_render)
+            results["results"].append({"scene": scene, "difficulty": difficulty,
+                                       "counts": SCENES[scene], "phases": phases})
+            row = " ".join(f"{p['p50']:>6.2f}/{p['p95']:>6.2f}/{p['p99']:>6.2f}ms"
+                           for p in (phases[phase] for phase in PHASES))
+            print(f"{scene:>14} {difficulty:>10} {row}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    regressions = 0
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+    pygame.quit()
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
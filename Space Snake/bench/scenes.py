@@ -0,0 +1,32 @@
+#Shared helpers for the benchmarks: crowded sessions and scripted input
+import pygame
+from settings import WIDTH
+
+#Scripted W/A/S/D input, one (key down) every 30 ticks, released 20 ticks later
+SCRIPT_KEYS = [pygame.K_d, pygame.K_s, pygame.K_a, pygame.K_w, pygame.K_d, pygame.K_w, pygame.K_a, pygame.K_s]
+
+def scripted_actions(tick):
+    key = SCRIPT_KEYS[(tick // 30) % len(SCRIPT_KEYS)]
+    if tick % 30 == 0:
+        return [(pygame.KEYDOWN, key)]
+    if tick % 30 == 20:
+        return [(pygame.KEYUP, key)]
+    return []
+
+#Add extra entities to a session, spread across the playfield
+def populate(sim, stars=0, obstacles=0, debris=0):
+    sprites = []
+    for _ in range(stars):
+        star = sim.add_star()
+        star.reset_position()
+        sprites.append(star)
+    sprites += [sim.add_obstacle() for _ in range(obstacles)]
+    sprites += [sim.add_debris() for _ in range(debris)]
+    for sprite in sprites:
+        sprite.rect.x -= sim.rng.randint(0, WIDTH)
+        if hasattr(sprite, "center"):
+            sprite.center = sprite.rect.center
+        if hasattr(sprite, "block_lane"):
+            sprite.block_lane()
+        sprite.moved()
+    return sim
@@ -0,0 +1,53 @@
+#Time to first frame, from launching the process to the first presented frame
+#
+#Runs the game with --startup-time a few times, with and without the asset
+#bundle, and reports the median launch-to-first-frame time plus the game's
+#own milestones (cumulative, from the top of game.py). Run from the
+#"Space Snake" folder. Pass the path of a PyInstaller build to time the
+#frozen game the same way:
+#
+#    python bench/startup.py
+#    python bench/startup.py --exe dist/game
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = ["imports", "init", "assets", "first_frame"]
+
+def run(command):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    launched = time.time()
+    output = subprocess.run(command + ["--startup-time", "--headless"], cwd=GAME_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    for line in output.splitlines():
+        if line.startswith("STARTUP "):
+            result = json.loads(line[len("STARTUP "):])
+            result["launch"] = result["epoch"] - launched
+            return result
+    raise RuntimeError(f"{command} did not report its startup time:\n{output}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Space Snake startup time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--exe", help="also time this frozen build")
+    args = parser.parse_args(argv)
+
+    builds = [("source", [sys.executable, "game.py"])]
+    if args.exe:
+        builds.append(("frozen", [os.path.abspath(args.exe)]))
+    print(f"{'build':>8} {'assets':>7} {'launch':>9} " + " ".join(f"{phase:>12}" for phase in PHASES))
+    for name, command in builds:
+        for bundle in (True, False):
+            runs = [run(command + ([] if bundle else ["--no-bundle"])) for _ in range(args.runs)]
+            used = "bundle" if all(result["bundle"] for result in runs) else "png"
+            median = {key: statistics.median(result[key] for result in runs) * 1e3 for key in ["launch"] + PHASES}
+            print(f"{name:>8} {used:>7} {median['launch']:>7.1f}ms " +
+                  " ".join(f"{median[phase]:>10.1f}ms" for phase in PHASES))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#Asset bundle builder
+#
+#Decodes, converts and scales every image the game loads and packs the
+#pixels into one file (assets.BUNDLE_PATH) that the game maps at startup.
+#Run it from the "Space Snake" folder whenever img/ changes, and before
+#building with PyInstaller:
+#
+#    python bundle.py
+import os
+import sys
+import json
+import struct
+from settings import use_dummy_drivers, asset_path, SNAKE_SIZE, STAR_SIZE
+use_dummy_drivers()
+
+import pygame
+from assets import AssetCache, MAGIC, BUNDLE_PATH
+
+#Every PNG directly in img/ is baked at its own size with alpha, plus these
+SCALED = [("img/snake.png", (SNAKE_SIZE, SNAKE_SIZE)), ("img/star.png", (STAR_SIZE, STAR_SIZE))]
+OPAQUE = ["img/bg2.png"]
+
+def variants():
+    images = sorted(f"img/{name}" for name in os.listdir(asset_path("img")) if name.endswith(".png"))
+    keys = [(path, None, True) for path in images]
+    keys += [(path, size, True) for path, size in SCALED]
+    keys += [(path, None, False) for path in OPAQUE]
+    return keys
+
+def build(path):
+    pygame.display.init()
+    #Conversion needs a display, the dummy one has the usual 32-bit format
+    pygame.display.set_mode((1, 1))
+    cache = AssetCache()
+    index = []
+    blobs = []
+    for image, size, alpha in variants():
+        surface = cache.load(image, size, alpha)
+        blobs.append(pygame.image.tobytes(surface, "BGRA" if alpha else "RGBX"))
+        index.append({"path": image, "size": size, "alpha": alpha,
+                      "width": surface.get_width(), "height": surface.get_height()})
+
+    #Offsets depend on the index length, so lay it out until it stops growing
+    offsets = [0] * len(index)
+    while True:
+        for entry, offset in zip(index, offsets):
+            entry["offset"] = offset
+        header = json.dumps(index).encode()
+        start = len(MAGIC) + 4 + len(header)
+        new = []
+        offset = -(-start // 16) * 16
+        for blob in blobs:
+            new.append(offset)
+            offset += -(-len(blob) // 16) * 16
+        if new == offsets:
+            break
+        offsets = new
+
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for blob, offset in zip(blobs, offsets):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(blob)
+    pygame.quit()
+    return len(index), os.path.getsize(path)
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else asset_path(BUNDLE_PATH)
+    count, size = build(path)
+    print(f"Wrote {count} images ({size / 1e6:.1f} MB) to {path}")
@@ -0,0 +1,50 @@
+import math
+import pygame
+
+#Radius of every mask in use. Masks come from the asset and rotation
+#caches, which call forget_mask() when they evict one (masks can't be
+#weakly referenced)
+radii = {}
+
+def forget_mask(mask):
+    radii.pop(mask, None)
+
+#Radius of a circle around a mask's center that holds every set pixel: the
+#farthest corner of the rects around its connected parts
+def mask_radius(mask):
+    radius = radii.get(mask)
+    if radius is None:
+        width, height = mask.get_size()
+        cx, cy = width / 2, height / 2
+        radius = max((math.hypot(max(cx - rect.left, rect.right - cx), max(cy - rect.top, rect.bottom - cy))
+                      for rect in mask.get_bounding_rects()), default=0.0)
+        radii[mask] = radius
+    return radius
+
+#Whether the circles around two sprites' masks overlap
+def circles_touch(a, b):
+    rect_a, rect_b = a.rect, b.rect
+    dx = rect_b.x - rect_a.x + (rect_b.width - rect_a.width) / 2
+    dy = rect_b.y - rect_a.y + (rect_b.height - rect_a.height) / 2
+    reach = mask_radius(a.mask) + mask_radius(b.mask)
+    return dx * dx + dy * dy <= reach * reach
+
+#Exact pixel overlap of two sprites' masks
+def masks_overlap(a, b):
+    return a.mask.overlap(b.mask, (b.rect.x - a.rect.x, b.rect.y - a.rect.y)) is not None
+
+# Exact narrow phase, a drop-in for pygame.sprite.collide_circle
+#
+# Both sprites need a `mask` matching their image. Rects that don't touch
+# and centers farther apart than the two mask radii are rejected first,
+# only pairs that pass both pay for a pixel overlap test.
+def collide_mask(a, b):
+    return a.rect.colliderect(b.rect) and circles_touch(a, b) and masks_overlap(a, b)
+
+# Narrow phase for (stars, obstacles, debris) against the snake, None tests
+# rects. "circle" is the original game's: rects for stars and circles
+# sized from SNAKE_SIZE and friends for the rest. "mask" follows the art.
+COLLISION_MODES = {
+    "mask": (collide_mask, collide_mask, collide_mask),
+    "circle": (None, pygame.sprite.collide_circle, pygame.sprite.collide_circle),
+}
@@ -0,0 +1,148 @@
+import numpy as np
+from settings import HEIGHT, SCROLL_SPEED
+
+#How a slot's columns map onto its sprite: the rect's top left, or a
+#rotating sprite's center and angle (which also picks its image)
+PLAIN, ROTATING = 0, 1
+
+# Struct-of-arrays entity store
+#
+# Holds the position of every scrolling sprite in NumPy columns (x, y,
+# angle, spin, reach, kind), one slot per sprite, so a tick moves, spins
+# and wraps all of them in a few array operations instead of one update()
+# call per sprite. Sprite rects fall behind the columns until sync() pushes
+# them, which only happens for the sprites that are about to be collided
+# with or drawn. Whenever a sprite jumps on its own (respawns, is placed)
+# pull() copies it back into the columns.
+#
+# Sprites with `pulled` set can also drift by a velocity (vx, vy) on top of
+# the scroll, which accelerate() changes (gravity). Drifting sprites are
+# synced and moved in the spatial hash every step, and stay on screen
+# vertically. A sprite jumping on its own stops drifting.
+class EntityStore:
+    def __init__(self, capacity=64):
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.angle = np.zeros(capacity)
+        self.spin = np.zeros(capacity)
+        #x + reach < 1 is the first frame the sprite may be off screen
+        self.reach = np.zeros(capacity)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        #Lowest y the sprite may drift to
+        self.floor = np.zeros(capacity)
+        self.pulled = np.zeros(capacity, dtype=bool)
+        #Add order, wrapped sprites respawn in the order a Group would update them
+        self.order = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.synced = np.zeros(capacity, dtype=bool)
+        self.sprites = [None] * capacity
+        self.free = list(range(capacity - 1, -1, -1))
+        self.seq = 0
+
+    def __len__(self):
+        return len(self.sprites) - len(self.free)
+
+    def clear(self):
+        for sprite in self.sprites:
+            if sprite is not None:
+                sprite.store = None
+        capacity = len(self.sprites)
+        self.alive[:] = False
+        self.sprites = [None] * capacity
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def _grow(self):
+        old = len(self.sprites)
+        for name in ("x", "y", "angle", "spin", "reach", "kind", "vx", "vy", "floor", "pulled", "order",
+                     "alive", "synced"):
+            column = getattr(self, name)
+            grown = np.zeros(old * 2, dtype=column.dtype)
+            grown[:old] = column
+            setattr(self, name, grown)
+        self.sprites += [None] * old
+        self.free = list(range(old * 2 - 1, old - 1, -1)) + self.free
+
+    def add(self, sprite):
+        if not self.free:
+            self._grow()
+        slot = self.free.pop()
+        self.seq += 1
+        self.sprites[slot] = sprite
+        self.order[slot] = self.seq
+        self.alive[slot] = True
+        sprite.store = self
+        sprite.slot = slot
+        self.pull(sprite)
+
+    def remove(self, sprite):
+        slot = sprite.slot
+        self.alive[slot] = False
+        self.sprites[slot] = None
+        self.free.append(slot)
+        sprite.store = None
+
+    #Copy a sprite's own position into the columns
+    def pull(self, sprite):
+        slot = sprite.slot
+        self.x[slot], self.y[slot], self.angle[slot], self.spin[slot], self.reach[slot] = sprite.position()
+        self.kind[slot] = ROTATING if sprite.rotates else PLAIN
+        #Rotating sprites are placed by their center, plain ones by the top left
+        self.floor[slot] = HEIGHT if sprite.rotates else HEIGHT - sprite.rect.height
+        self.pulled[slot] = sprite.pulled
+        self.vx[slot] = self.vy[slot] = 0
+        self.synced[slot] = True
+
+    #Push the columns into sprite rects, for every stale sprite or just `sprites`
+    def sync(self, sprites=None):
+        if sprites is None:
+            slots = np.flatnonzero(self.alive & ~self.synced)
+        else:
+            slots = np.array([sprite.slot for sprite in sprites if sprite.store is self], dtype=np.int64)
+            slots = slots[~self.synced[slots]]
+        if not len(slots):
+            return
+        sprites = self.sprites
+        for slot, x, y, angle, kind in zip(slots.tolist(), self.x[slots].tolist(), self.y[slots].tolist(),
+                                           self.angle[slots].tolist(), self.kind[slots].tolist()):
+            if kind == ROTATING:
+                sprites[slot].place(x, y, angle)
+            else:
+                sprites[slot].rect.topleft = (x, y)
+        self.synced[slots] = True
+
+    #Change the velocity of `slots` by (ax, ay), each component kept within +-limit
+    def accelerate(self, slots, ax, ay, limit):
+        self.vx[slots] = np.clip(self.vx[slots] + ax, -limit, limit)
+        self.vy[slots] = np.clip(self.vy[slots] + ay, -limit, limit)
+
+    #Alive slots that can drift
+    def drifters(self):
+        return np.flatnonzero(self.alive & self.pulled)
+
+    #Scroll everything left, spin what rotates and respawn what left the screen
+    def step(self, grid=None):
+        alive = self.alive
+        self.x -= SCROLL_SPEED
+        self.angle += self.spin
+        self.synced[:] = False
+        drifting = np.flatnonzero(alive & ((self.vx != 0) | (self.vy != 0)))
+        if len(drifting):
+            self.x[drifting] += self.vx[drifting]
+            self.y[drifting] = np.clip(self.y[drifting] + self.vy[drifting], 0, self.floor[drifting])
+            #Their cells no longer just scroll with the grid
+            if grid is not None:
+                sprites = [self.sprites[slot] for slot in drifting.tolist()]
+                self.sync(sprites)
+                for sprite in sprites:
+                    grid.update(sprite)
+        slots = np.flatnonzero(alive & (self.x + self.reach < 1))
+        if not len(slots):
+            return
+        #The rect decides, rotating sprites only know their width once synced
+        sprites = self.sprites
+        self.sync([sprites[slot] for slot in slots])
+        gone = [slot for slot in slots[np.argsort(self.order[slots])].tolist() if sprites[slot].rect.right < 0]
+        for slot in gone:
+            sprites[slot].reset_position()
@@ -0,0 +1,76 @@
+import numpy as np
+import pygame
+from settings import WIDTH, HEIGHT
+
+#Table spacing in pixels and the error it keeps to, see GravityField
+CELL = 4
+FIELD_TOLERANCE = 0.01
+
+# Cached gravity field
+#
+# The gravity at (x, y) is (P(x), P(y)) where P is the Lagrange polynomial
+# through the current nodes. P depends on one coordinate only, so the field
+# keeps a single table of it, one entry every `cell` pixels across the
+# playfield, and interpolates it linearly for both components. Any number
+# of sprites then feel gravity at a constant cost each. The table is only
+# rebuilt, in one vectorized evaluate() call, when the interpolator's nodes
+# changed since the last build. Positions outside the playfield are clamped
+# to its edge.
+#
+# Linear interpolation is off by up to cell^2 / 8 * |P''|. With the default
+# cell, up to 25 nodes on the playfield (24 stars and the snake) stay within
+# FIELD_TOLERANCE of the strongest field on screen; bench/bench_field.py
+# checks it. P grows steeply with more nodes, pass a smaller cell then.
+class GravityField:
+    def __init__(self, interpolator, cell=CELL):
+        self.interpolator = interpolator
+        self.cell = cell
+        self.xs = np.arange(0, WIDTH + cell, cell, dtype=float)
+        self.ys = np.arange(0, HEIGHT + cell, cell, dtype=float)
+        #Table positions, enough to cover both axes
+        self.grid = self.xs if len(self.xs) >= len(self.ys) else self.ys
+        self.table = np.zeros(len(self.grid))
+        self.version = None
+        self.builds = 0
+
+    #Rebuild the table if the nodes moved, returns whether it did
+    def update(self):
+        if self.version == self.interpolator.version:
+            return False
+        self.table[:] = self.interpolator.evaluate(self.grid)
+        self.version = self.interpolator.version
+        self.builds += 1
+        return True
+
+    #(fx, fy) arrays at the points (xs, ys)
+    def sample(self, xs, ys):
+        self.update()
+        xs = np.clip(np.asarray(xs, dtype=float), 0, WIDTH)
+        ys = np.clip(np.asarray(ys, dtype=float), 0, HEIGHT)
+        return np.interp(xs, self.grid, self.table), np.interp(ys, self.grid, self.table)
+
+    # Debug heat map
+    #
+    # Field strength as a translucent window-sized surface, blue where it is
+    # weak and red where it is strong. The magnitude spans many orders, so
+    # the colors follow its log, scaled to what is on the grid right now.
+    def heat_map(self, alpha=110):
+        self.update()
+        fx = self.table[:len(self.xs)]
+        fy = self.table[:len(self.ys)]
+        with np.errstate(divide="ignore"):
+            strength = np.log10(np.hypot(fx[None, :], fy[:, None]))
+        finite = np.isfinite(strength)
+        if finite.any():
+            low, high = strength[finite].min(), strength[finite].max()
+            level = (strength - low) / (high - low) if high > low else np.zeros_like(strength)
+        else:
+            level = np.zeros_like(strength)
+        level = np.where(finite, level, 0.0)
+        pixels = np.zeros((len(self.xs), len(self.ys), 3), dtype=np.uint8)
+        pixels[..., 0] = (255 * level).T
+        pixels[..., 1] = (80 * (1 - abs(2 * level - 1))).T
+        pixels[..., 2] = (255 * (1 - level)).T
+        surface = pygame.transform.smoothscale(pygame.surfarray.make_surface(pixels), (WIDTH, HEIGHT))
+        surface.set_alpha(alpha)
+        return surface
@@ -1,11 +1,17 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
 
+# Images and music ship with the build, plus assets.bin when it has been
+# built (python bundle.py) so the frozen game skips decoding the PNGs
+datas = [('img', 'img'), ('bgm', 'bgm')]
+if os.path.exists('assets.bin'):
+    datas.append(('assets.bin', '.'))
 
 a = Analysis(
     ['game.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=datas,
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,54 @@
+from collections import OrderedDict
+from settings import WHITE
+
+# Rendered text cache
+#
+# font.render is only called the first time a (text, color) pair is seen.
+# Least recently used surfaces are dropped past `capacity`, so counters that
+# keep changing (score, time) can't grow the cache without bound while
+# labels drawn every frame stay cached.
+class TextCache:
+    def __init__(self, font, capacity=64):
+        self.font = font
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def render(self, text, color):
+        key = (text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def stats(self):
+        return {"surfaces": len(self.surfaces), "hits": self.hits, "misses": self.misses}
+
+# Score and timer overlay
+class Hud:
+    def __init__(self, text):
+        self.text = text
+        self.score = None
+        self.time = None
+
+    def draw(self, renderer, score, time):
+        #Only re-render when the values change
+        if score != self.score:
+            self.score = score
+            self.score_img = self.text.render(f"Score: {score}", WHITE)
+        if time != self.time:
+            self.time = time
+            self.time_img = self.text.render(f"Time: {time}", WHITE)
+        renderer.blit(self.score_img, (10, 10))
+        renderer.blit(self.time_img, (10, 40))
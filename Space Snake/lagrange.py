@@ -0,0 +1,250 @@
+import numpy as np
+
+# Reference Lagrange interpolation (the original O(n^2) version from game.py)
+def lagrange_interpolation(x, points):
+    result = 0
+    for i, (x_i, y_i) in enumerate(points):
+        find = y_i
+        for j, (x_j, _) in enumerate(points):
+            if i != j and x_i != x_j:
+                find *= (x - x_j) / (x_i - x_j)
+        result += find
+    return result
+
+#Below this many distinct x values evaluate() runs the reference loop for
+#up to DIRECT_QUERIES points, which beats NumPy's per-call overhead when
+#there are only a few nodes
+DIRECT_NODES = 20
+DIRECT_QUERIES = 4
+
+# Barycentric Lagrange interpolation with incremental weight updates
+#
+# Nodes are stored once per distinct x, with their y values summed and how
+# many nodes share that x. The reference version skips only the
+# x_i == x_j factor, so every other node keeps one (q - x) factor per copy
+# of a duplicate. The weights follow it: w_u = prod((u - v) ^ -m_v) and
+# l(q) = prod((q - v) ^ m_v) over the distinct x values v, m_v nodes each.
+# Weights are kept as log-normalised values so they never overflow, and a
+# translation of every node (stars all scroll left at the same speed) only
+# moves an offset instead of touching the weights.
+#
+# With fewer than `direct_nodes` distinct x values the weights are not kept
+# up to date. evaluate() runs the reference loop instead, and the weights
+# are rebuilt when it gets more points than that pays off for or the node
+# count grows past it.
+# `version` changes whenever the interpolated function does.
+class BarycentricInterpolator:
+    def __init__(self, span=2000.0, capacity=16, direct_nodes=DIRECT_NODES):
+        self.scale = 4.0 / span
+        self.direct_nodes = direct_nodes
+        self.offset = 0.0
+        self.log_c = 0.0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.w = np.zeros(capacity)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+        self.slots = {}
+        self.nodes = {}
+        self.stale = True
+        self.version = 0
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, key):
+        return key in self.nodes
+
+    def clear(self):
+        self.version += 1
+        self.offset = 0.0
+        self.log_c = 0.0
+        self.size = 0
+        self.stale = True
+        self.slots.clear()
+        self.nodes.clear()
+
+    def points(self):
+        return [(x + self.offset, y) for x, y in self.nodes.values()]
+
+    #Every node (duplicates included) as an (n, 2) array
+    def node_array(self):
+        nodes = np.array(list(self.nodes.values()), dtype=float).reshape(-1, 2)
+        nodes[:, 0] += self.offset
+        return nodes
+
+    def _grow(self):
+        capacity = len(self.x) * 2
+        for name in ("x", "y", "w", "count"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def _normalise(self):
+        n = self.size
+        if n:
+            m = np.abs(self.w[:n]).max()
+            if m > 0:
+                self.w[:n] /= m
+                self.log_c -= np.log(m)
+
+    #Whether weights are kept up to date for the current node count
+    def _tracking(self):
+        if self.size < self.direct_nodes:
+            self.stale = True
+        return not self.stale
+
+    #Every weight from scratch, O(n^2)
+    def _rebuild(self):
+        n = self.size
+        x = self.x[:n]
+        m = self.count[:n]
+        d = (x[:, None] - x[None, :]) * self.scale
+        np.fill_diagonal(d, 1.0)
+        log_w = -(np.log(np.abs(d)) * m[None, :]).sum(axis=1)
+        negative = ((d < 0) * m[None, :]).sum(axis=1)
+        self.log_c = -log_w.max()
+        self.w[:n] = np.where(negative % 2, -1.0, 1.0) * np.exp(log_w + self.log_c)
+        self.stale = False
+
+    def _insert_x(self, x_rel, y):
+        self.version += 1
+        slot = self.slots.get(x_rel)
+        n = self.size
+        if slot is not None:
+            #Duplicate x, every other weight gains one more 1 / (v - x) factor
+            self.y[slot] += y
+            self.count[slot] += 1
+            if self._tracking():
+                diffs = (self.x[:n] - x_rel) * self.scale
+                diffs[slot] = 1.0
+                self.w[:n] /= diffs
+                self._normalise()
+            return
+        if n == len(self.x):
+            self._grow()
+        tracking = self._tracking()
+        if tracking:
+            #The new weight has a factor per node, with its multiplicity
+            diffs = (self.x[:n] - x_rel) * self.scale
+            self.w[:n] /= diffs
+            m = self.count[:n]
+            sign = -1.0 if (m * (diffs > 0)).sum() % 2 else 1.0
+            self.w[n] = sign * np.exp(self.log_c - (np.log(np.abs(diffs)) * m).sum())
+        self.x[n] = x_rel
+        self.y[n] = y
+        self.count[n] = 1
+        self.slots[x_rel] = n
+        self.size = n + 1
+        if tracking:
+            self._normalise()
+
+    def _remove_x(self, x_rel, y):
+        self.version += 1
+        slot = self.slots[x_rel]
+        if self.count[slot] > 1:
+            self.y[slot] -= y
+            self.count[slot] -= 1
+            if self._tracking():
+                diffs = (self.x[:self.size] - x_rel) * self.scale
+                diffs[slot] = 1.0
+                self.w[:self.size] *= diffs
+                self._normalise()
+            return
+        n = self.size - 1
+        del self.slots[x_rel]
+        #Swap the last slot into the hole
+        if slot != n:
+            for arr in (self.x, self.y, self.w, self.count):
+                arr[slot] = arr[n]
+            self.slots[self.x[slot]] = slot
+        self.size = n
+        if not self._tracking():
+            return
+        self.w[:n] *= (self.x[:n] - x_rel) * self.scale
+        self._normalise()
+
+    def add(self, key, x, y):
+        if key in self.nodes:
+            self.move(key, x, y)
+            return
+        x_rel = x - self.offset
+        self.nodes[key] = (x_rel, y)
+        self._insert_x(x_rel, y)
+
+    def remove(self, key):
+        x_rel, y = self.nodes.pop(key)
+        self._remove_x(x_rel, y)
+
+    def move(self, key, x, y):
+        old_x, old_y = self.nodes[key]
+        x_rel = x - self.offset
+        if x_rel == old_x:
+            if y == old_y:
+                return
+            #Only y changed, O(1)
+            self.y[self.slots[x_rel]] += y - old_y
+            self.version += 1
+        else:
+            self._remove_x(old_x, old_y)
+            self._insert_x(x_rel, y)
+        self.nodes[key] = (x_rel, y)
+
+    def translate(self, dx):
+        #Moving every node by the same amount leaves the weights unchanged
+        self.offset += dx
+        self.version += 1
+
+    def sync(self, nodes):
+        #Bring the node set in line with a {key: (x, y)} mapping
+        for key in [key for key in self.nodes if key not in nodes]:
+            self.remove(key)
+
+        shifts = {}
+        for key, (x, _) in nodes.items():
+            old = self.nodes.get(key)
+            if old is not None:
+                dx = x - (old[0] + self.offset)
+                if dx:
+                    shifts[dx] = shifts.get(dx, 0) + 1
+        if shifts:
+            dx = max(shifts, key=shifts.get)
+            if shifts[dx] > 1:
+                self.translate(dx)
+
+        for key, (x, y) in nodes.items():
+            if key in self.nodes:
+                self.move(key, x, y)
+            else:
+                self.add(key, x, y)
+
+    def evaluate(self, xs):
+        xs = np.atleast_1d(np.asarray(xs, dtype=float))
+        n = self.size
+        if n == 0:
+            return np.zeros(len(xs))
+        if n < self.direct_nodes and len(xs) <= DIRECT_QUERIES:
+            points = self.points()
+            return np.array([lagrange_interpolation(q, points) for q in xs.tolist()], dtype=float)
+        if self.stale:
+            self._rebuild()
+        x = self.x[:n] + self.offset
+        y = self.y[:n]
+        m = self.count[:n]
+        d = (xs[:, None] - x[None, :]) * self.scale
+        exact = d == 0
+        #First (modified Lagrange) form, stable for extrapolation as well.
+        #l(q) = prod(d ^ m) is carried in log space so large node counts
+        #never overflow.
+        #A power with an array of exponents is far slower than a division,
+        #so it is only taken when some x is shared
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            s = (self.w[:n] / (d ** m if (m > 1).any() else d)) @ y
+            log_l = np.log(np.abs(d)) @ m
+            sign = np.where((d < 0) @ m % 2, -1.0, 1.0)
+            result = sign * np.sign(s) * np.exp(log_l - self.log_c + np.log(np.abs(s)))
+        hits = exact.any(axis=1)
+        if hits.any():
+            result[hits] = y[exact[hits].argmax(axis=1)]
+        return result
@@ -0,0 +1,69 @@
+from bisect import bisect_right
+
+# Vertical free-lane index
+#
+# Keeps the y values in [low, high) that no blocker covers as a sorted list
+# of free intervals. Blockers only change when a star respawns or is
+# collected, so the interval list is rebuilt lazily on the next query after
+# a change, and each query is a bisect over the cumulative interval lengths.
+class LaneIndex:
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+        self.blockers = {}
+        self.dirty = True
+        self.free = []
+        self.starts = []
+        self.total = 0
+
+    def __len__(self):
+        return len(self.blockers)
+
+    def clear(self):
+        self.blockers.clear()
+        self.dirty = True
+
+    #Block [top, bottom) for a key, replacing whatever it blocked before
+    def block(self, key, top, bottom):
+        if self.blockers.get(key) != (top, bottom):
+            self.blockers[key] = (top, bottom)
+            self.dirty = True
+
+    def unblock(self, key):
+        if self.blockers.pop(key, None) is not None:
+            self.dirty = True
+
+    def rebuild(self):
+        self.free = []
+        y = self.low
+        for top, bottom in sorted(self.blockers.values()):
+            if top > y:
+                self.free.append((y, min(top, self.high)))
+            y = max(y, bottom)
+            if y >= self.high:
+                break
+        if y < self.high:
+            self.free.append((y, self.high))
+
+        self.free = [(top, bottom) for top, bottom in self.free if top < bottom]
+        self.starts = []
+        self.total = 0
+        for top, bottom in self.free:
+            self.starts.append(self.total)
+            self.total += bottom - top
+        self.dirty = False
+
+    def intervals(self):
+        if self.dirty:
+            self.rebuild()
+        return list(self.free)
+
+    #Uniformly random free y, or None when everything is blocked
+    def random_free(self, rng):
+        if self.dirty:
+            self.rebuild()
+        if not self.total:
+            return None
+        r = rng.randrange(self.total)
+        i = bisect_right(self.starts, r) - 1
+        return self.free[i][0] + r - self.starts[i]
@@ -0,0 +1,48 @@
+# Sprite pool
+#
+# Hands out recycled sprites instead of constructing new ones. acquire()
+# calls the sprite's spawn() so a recycled sprite starts exactly like a
+# fresh one, release() takes it back once it has left its groups.
+class SpritePool:
+    def __init__(self, factory, size=0):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        self.in_use = 0
+        self.high_water = 0
+        self.prewarm(size)
+
+    def __len__(self):
+        return len(self.free)
+
+    #Construct sprites up front so gameplay doesn't have to
+    def prewarm(self, size):
+        while len(self.free) + self.in_use < size:
+            self.free.append(self.factory())
+            self.created += 1
+
+    def acquire(self):
+        if self.free:
+            sprite = self.free.pop()
+            self.reused += 1
+        else:
+            sprite = self.factory()
+            self.created += 1
+        self.in_use += 1
+        self.high_water = max(self.high_water, self.in_use)
+        sprite.spawn()
+        return sprite
+
+    def release(self, sprite):
+        self.in_use -= 1
+        self.free.append(sprite)
+
+    def stats(self):
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "in_use": self.in_use,
+            "free": len(self.free),
+            "high_water": self.high_water,
+        }
@@ -0,0 +1,92 @@
+import time
+import numpy as np
+import pygame
+from settings import WIDTH, WHITE
+
+PHASES = ["events", "gravity", "collision", "spawn", "update", "draw", "display"]
+
+# Per-phase frame profiler
+#
+# Times each phase of a frame into a fixed-size ring buffer (one row per
+# frame, one column per phase, in seconds). Every method returns straight
+# away while disabled, so leaving the calls in the loop costs a few
+# attribute lookups per frame.
+class Profiler:
+    def __init__(self, size=600, refresh=30):
+        self.enabled = False
+        self.size = size
+        self.refresh = refresh
+        self.samples = np.zeros((size, len(PHASES)))
+        self.columns = {phase: i for i, phase in enumerate(PHASES)}
+        self.index = 0
+        self.count = 0
+        self.row = np.zeros(len(PHASES))
+        self.last = 0.0
+        self.overlay = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.overlay = None
+        #Turned on mid-frame, time the rest of it from here
+        self.row[:] = 0
+        self.last = time.perf_counter()
+
+    def start_frame(self):
+        if self.enabled:
+            self.row[:] = 0
+            self.last = time.perf_counter()
+
+    def mark(self, phase):
+        if self.enabled:
+            now = time.perf_counter()
+            self.row[self.columns[phase]] += now - self.last
+            self.last = now
+
+    def end_frame(self):
+        if self.enabled:
+            self.samples[self.index] = self.row
+            self.index = (self.index + 1) % self.size
+            self.count = min(self.count + 1, self.size)
+
+    #Recorded frames, oldest first
+    def frames(self):
+        if self.count < self.size:
+            return self.samples[:self.count]
+        return np.roll(self.samples, -self.index, axis=0)
+
+    def summary(self):
+        frames = self.frames()
+        if not len(frames):
+            return {}
+        totals = frames.sum(axis=1)
+        result = {phase: (frames[:, i].mean(), np.percentile(frames[:, i], 95)) for phase, i in self.columns.items()}
+        result["total"] = (totals.mean(), np.percentile(totals, 95))
+        return result
+
+    def dump_csv(self, path):
+        frames = self.frames()
+        with open(path, "w") as f:
+            f.write("frame," + ",".join(f"{phase}_ms" for phase in PHASES) + "\n")
+            for n, row in enumerate(frames):
+                f.write(f"{n}," + ",".join(f"{value * 1e3:.4f}" for value in row) + "\n")
+        return len(frames)
+
+    #Overlay with mean/p95 per phase, recomposed every `refresh` frames
+    def draw(self, renderer, font, extra=()):
+        if not self.enabled:
+            return
+        if self.overlay is None or self.index % self.refresh == 0:
+            lines = ["phase      mean    p95 (ms)"]
+            for phase, (mean, p95) in self.summary().items():
+                lines.append(f"{phase:<9}{mean * 1e3:>6.2f} {p95 * 1e3:>6.2f}")
+            lines += list(extra)
+            images = [font.render(line, True, WHITE) for line in lines]
+            width = max(image.get_width() for image in images) + 16
+            height = sum(image.get_height() for image in images) + 16
+            self.overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+            self.overlay.fill((0, 0, 0, 160))
+            y = 8
+            for image in images:
+                self.overlay.blit(image, (8, y))
+                y += image.get_height()
+        renderer.blit(self.overlay, (WIDTH - self.overlay.get_width() - 10, 10))
@@ -0,0 +1,257 @@
+import math
+import weakref
+import pygame
+from settings import WIDTH, HEIGHT, SCROLL_SPEED
+from assets import rotations
+
+RENDER_MODES = ["full", "dirty", "none"]
+#"surface" blits in software onto the display surface, the texture backends
+#draw GPU textures through an SDL renderer, "texture-software" forces SDL's
+#software renderer
+BACKENDS = ["surface", "texture", "texture-software"]
+
+#The window to draw into: the display surface, or an SDL window for textures.
+#pygame._sdl2 is experimental and not in every pygame build, so it is only
+#imported for the texture backends
+def open_window(backend, title="Space Snake"):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if backend == "surface":
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption(title)
+        return screen
+    from pygame._sdl2 import video
+    return video.Window(title, (WIDTH, HEIGHT))
+
+def make_renderer(window, bg, backend="surface", mode="full", bg_every=0):
+    if backend == "surface":
+        return Renderer(window, bg, mode, bg_every)
+    return TextureRenderer(window, bg, mode, software=backend == "texture-software")
+
+#Merge overlapping rects so no pixel is pushed twice
+def merge_rects(rects):
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        if rect.width <= 0 or rect.height <= 0:
+            continue
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+# Frame renderer
+#
+# "full" redraws the background and pushes the whole window every frame,
+# like the game always did. "dirty" only pushes what changed: everything
+# drawn this frame plus what was drawn last frame (which has to be erased).
+# Erasing copies from a pre-composited background strip. The background
+# itself only scrolls every `bg_every` frames in dirty mode (0 keeps it
+# still), since a scroll changes every pixel on screen. "none" draws nothing,
+# for headless and uncapped replays.
+#
+# A static layer (a menu screen) is passed to background() and counts as
+# part of the background: in dirty mode it is only pushed when it changes,
+# and erasing what was drawn over it puts it back.
+class Renderer:
+    def __init__(self, screen, bg, mode="full", bg_every=0):
+        if mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode {mode!r}, expected one of {RENDER_MODES}")
+        self.screen = screen
+        self.mode = mode
+        self.enabled = mode != "none"
+        self.bg_every = 1 if mode == "full" else bg_every
+        self.bg_width = bg.get_width()
+
+        #Background strip, tiled once so one blit covers the window at any scroll
+        tiles = math.ceil(WIDTH / self.bg_width) + 1
+        self.strip = pygame.Surface((tiles * self.bg_width, HEIGHT)).convert()
+        for i in range(tiles):
+            self.strip.blit(bg, (i * self.bg_width, 0))
+
+        self.scroll = 0
+        self.frame = 0
+        self.full_redraw = True
+        self.drawn = []
+        self.previous = []
+        self.changed = []
+        self.layer = None
+        self.pushed_area = 0
+        self.total_area = 0
+        self.frames = 0
+
+    #Draw the background, scrolling it when it is due, with an optional
+    #(surface, pos) static layer on top
+    def background(self, layer=None):
+        if not self.enabled:
+            return
+        self.frame += 1
+        if self.bg_every and self.frame % self.bg_every == 0:
+            self.scroll -= SCROLL_SPEED * self.bg_every
+            if abs(self.scroll) > self.bg_width:
+                self.scroll = 0
+            self.full_redraw = True
+        if layer is not None:
+            layer = (layer[0], layer[0].get_rect(topleft=layer[1]))
+        if self.mode == "full" or self.full_redraw:
+            self.screen.blit(self.strip, (self.scroll, 0))
+            if layer is not None:
+                self.screen.blit(*layer)
+        else:
+            same = layer is not None and self.layer is not None and \
+                layer[0] is self.layer[0] and layer[1] == self.layer[1]
+            #Erase last frame's drawing, down to the layer if it stays
+            for rect in self.previous:
+                self.screen.blit(self.strip, rect, rect.move(-self.scroll, 0))
+                if same and rect.colliderect(layer[1]):
+                    clip = rect.clip(layer[1])
+                    self.screen.blit(layer[0], clip, clip.move(-layer[1].x, -layer[1].y))
+            if not same:
+                if self.layer is not None:
+                    self.screen.blit(self.strip, self.layer[1], self.layer[1].move(-self.scroll, 0))
+                    self.changed.append(self.layer[1])
+                if layer is not None:
+                    self.screen.blit(*layer)
+                    self.changed.append(layer[1])
+        self.layer = layer
+
+    def blit(self, surface, pos):
+        if not self.enabled:
+            return None
+        rect = self.screen.blit(surface, pos)
+        self.drawn.append(rect)
+        return rect
+
+    def rect(self, color, rect):
+        if not self.enabled:
+            return None
+        rect = pygame.draw.rect(self.screen, color, rect)
+        self.drawn.append(rect)
+        return rect
+
+    def group(self, group):
+        if not self.enabled:
+            return
+        for sprite in group:
+            self.blit(sprite.image, sprite.rect)
+
+    #Push the frame to the display
+    def present(self):
+        if not self.enabled:
+            self.pushed_area = 0
+        elif self.mode == "full" or self.full_redraw:
+            pygame.display.update()
+            self.pushed_area = WIDTH * HEIGHT
+        else:
+            rects = merge_rects(self.previous + self.drawn + self.changed)
+            pygame.display.update(rects)
+            self.pushed_area = sum(rect.width * rect.height for rect in rects)
+        self.previous = [rect.clip(self.screen.get_rect()) for rect in self.drawn]
+        self.drawn = []
+        self.changed = []
+        self.full_redraw = False
+        self.total_area += self.pushed_area
+        self.frames += 1
+
+    def mean_pushed_area(self):
+        return self.total_area / self.frames if self.frames else 0
+
+# GPU texture renderer
+#
+# Same drawing calls as Renderer, for an SDL window. Every surface is
+# uploaded to a texture the first time it is drawn and the texture is kept
+# for as long as the surface lives, so the background, sprites and cached
+# text are only uploaded once. Spinning sprites draw their unrotated image
+# turned by the GPU instead of a pre-rotated surface. The whole frame is
+# redrawn every time (there is no "dirty" mode here, it draws like "full"),
+# "none" still draws nothing. Asks for a hardware renderer and falls back
+# to SDL's software one when there is none, or right away with `software`.
+class TextureRenderer:
+    def __init__(self, window, bg, mode="full", software=False):
+        from pygame._sdl2 import video
+        from pygame._sdl2.sdl2 import error as SDLError
+        if mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode {mode!r}, expected one of {RENDER_MODES}")
+        self.Texture = video.Texture
+        self.window = window
+        self.mode = mode
+        self.enabled = mode != "none"
+        self.accelerated = False
+        self.renderer = None
+        if not software:
+            try:
+                self.renderer = video.Renderer(window, accelerated=1)
+                self.accelerated = True
+            except SDLError as error:
+                print(f"No hardware renderer ({error}), using the software one")
+        if self.renderer is None:
+            self.renderer = video.Renderer(window, accelerated=0)
+        self.textures = weakref.WeakKeyDictionary()
+        self.uploads = 0
+
+        self.bg = self.texture(bg)
+        self.bg_width = bg.get_width()
+        self.tiles = math.ceil(WIDTH / self.bg_width) + 1
+        self.scroll = 0
+        self.pushed_area = 0
+        self.total_area = 0
+        self.frames = 0
+
+    def texture(self, surface):
+        texture = self.textures.get(surface)
+        if texture is None:
+            texture = self.Texture.from_surface(self.renderer, surface)
+            self.textures[surface] = texture
+            self.uploads += 1
+        return texture
+
+    #Draw the background, scrolled every frame, with an optional static layer on top
+    def background(self, layer=None):
+        if not self.enabled:
+            return
+        self.scroll -= SCROLL_SPEED
+        if abs(self.scroll) > self.bg_width:
+            self.scroll = 0
+        for i in range(self.tiles):
+            self.bg.draw(dstrect=(self.scroll + i * self.bg_width, 0))
+        if layer is not None:
+            self.texture(layer[0]).draw(dstrect=layer[1])
+
+    def blit(self, surface, pos):
+        if not self.enabled:
+            return None
+        rect = surface.get_rect(topleft=pos[:2])
+        self.texture(surface).draw(dstrect=rect)
+        return rect
+
+    def rect(self, color, rect):
+        if not self.enabled:
+            return None
+        self.renderer.draw_color = color
+        self.renderer.fill_rect(rect)
+        return pygame.Rect(rect)
+
+    def group(self, group):
+        if not self.enabled:
+            return
+        for sprite in group:
+            if getattr(sprite, "rotates", False):
+                #pygame.transform.rotate turns counterclockwise, SDL clockwise
+                image = rotations.get(sprite.image_path, 0)[0]
+                self.texture(image).draw(dstrect=image.get_rect(center=sprite.center), angle=-sprite.angle)
+            else:
+                self.blit(sprite.image, sprite.rect)
+
+    def present(self):
+        if self.enabled:
+            self.renderer.present()
+            self.pushed_area = WIDTH * HEIGHT
+        else:
+            self.pushed_area = 0
+        self.total_area += self.pushed_area
+        self.frames += 1
+
+    def mean_pushed_area(self):
+        return self.total_area / self.frames if self.frames else 0
@@ -0,0 +1,134 @@
+import struct
+import pygame
+
+#The digit is the format version. Version 1 had no sim config in the header
+MAGIC = b"SSREP2\n"
+MAGIC_V1 = b"SSREP1\n"
+
+#Sim settings a replay only plays back correctly with
+CONFIG_KEYS = ["collision", "waves", "spawn_budget", "field_pull"]
+
+#Event kinds stored in a replay
+KEY_DOWN, KEY_UP, MOUSE_DOWN = 0, 1, 2
+KINDS = {pygame.KEYDOWN: KEY_DOWN, pygame.KEYUP: KEY_UP, pygame.MOUSEBUTTONDOWN: MOUSE_DOWN}
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def write_text(out, text):
+    data = text.encode("utf-8")
+    write_varint(out, len(data))
+    out += data
+
+def read_text(data, pos):
+    length, pos = read_varint(data, pos)
+    return data[pos:pos + length].decode("utf-8"), pos + length
+
+# Input recorder
+#
+# A session is its seed and sim config plus every key and mouse-button
+# event with the tick it arrived on. Ticks are stored as varint deltas from
+# the previous event, so idle stretches cost nothing and a typical event
+# takes 3-7 bytes. `config` holds the CONFIG_KEYS the sim was created with.
+class ReplayRecorder:
+    def __init__(self, seed, config):
+        self.seed = seed
+        self.config = {key: config[key] for key in CONFIG_KEYS}
+        self.events = []
+        self.ticks = 0
+
+    def record(self, tick, events):
+        for event in events:
+            kind = KINDS.get(event.type)
+            if kind == MOUSE_DOWN:
+                self.events.append((tick, kind, event.button, event.pos))
+            elif kind is not None:
+                self.events.append((tick, kind, event.key, None))
+        self.ticks = tick + 1
+
+    def save(self, path):
+        out = bytearray(MAGIC)
+        out += struct.pack("<QII", self.seed, self.ticks, len(self.events))
+        #No wave profile is stored as "", the difficulty's waves
+        write_text(out, self.config["collision"])
+        write_text(out, self.config["waves"] or "")
+        write_varint(out, self.config["spawn_budget"])
+        out.append(bool(self.config["field_pull"]))
+        last = 0
+        for tick, kind, code, pos in self.events:
+            write_varint(out, tick - last)
+            last = tick
+            out.append(kind)
+            write_varint(out, code)
+            if kind == MOUSE_DOWN:
+                out += struct.pack("<HH", *pos)
+        with open(path, "wb") as f:
+            f.write(out)
+        return len(out)
+
+# Recorded session, hands the events back tick by tick as pygame events.
+# `config` is None for version 1 replays, which didn't store it
+class Replay:
+    def __init__(self, seed, ticks, events, config=None):
+        self.seed = seed
+        self.config = config
+        self.ticks = ticks
+        self.by_tick = {}
+        for tick, kind, code, pos in events:
+            if kind == MOUSE_DOWN:
+                event = pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=code, pos=pos)
+            else:
+                event_type = pygame.KEYDOWN if kind == KEY_DOWN else pygame.KEYUP
+                event = pygame.event.Event(event_type, key=code)
+            self.by_tick.setdefault(tick, []).append(event)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith((MAGIC, MAGIC_V1)):
+            raise ValueError(f"{path} is not a Space Snake replay")
+        pos = len(MAGIC)
+        seed, ticks, count = struct.unpack_from("<QII", data, pos)
+        pos += struct.calcsize("<QII")
+        config = None
+        if data.startswith(MAGIC):
+            collision, pos = read_text(data, pos)
+            waves, pos = read_text(data, pos)
+            spawn_budget, pos = read_varint(data, pos)
+            config = {"collision": collision, "waves": waves or None,
+                      "spawn_budget": spawn_budget, "field_pull": bool(data[pos])}
+            pos += 1
+        events = []
+        tick = 0
+        for _ in range(count):
+            delta, pos = read_varint(data, pos)
+            tick += delta
+            kind = data[pos]
+            pos += 1
+            code, pos = read_varint(data, pos)
+            event_pos = None
+            if kind == MOUSE_DOWN:
+                event_pos = struct.unpack_from("<HH", data, pos)
+                pos += 4
+            events.append((tick, kind, code, event_pos))
+        return cls(seed, ticks, events, config)
+
+    def events(self, tick):
+        return list(self.by_tick.get(tick, ()))
+
+    def finished(self, tick):
+        return tick >= self.ticks
@@ -0,0 +1,75 @@
+import pygame
+from settings import WIDTH, HEIGHT, BLACK, WHITE
+from assets import assets
+
+# Static menu screen
+#
+# Images, white buttons and their labels composed once into a transparent
+# overlay, cropped to what they cover. The overlay is only composed again
+# when the changing text from `labels` (a function returning
+# (text, color, pos) tuples) differs from last time. Button rects are in
+# window coordinates, hit() tells which one a click landed on.
+class Screen:
+    def __init__(self, text, images=(), buttons=(), labels=None):
+        self.text = text
+        self.images = list(images)
+        self.buttons = {}
+        self.button_labels = []
+        for name, rect, label, label_pos in buttons:
+            self.buttons[name] = pygame.Rect(rect)
+            self.button_labels.append((label, label_pos))
+        self.labels = labels
+        self.overlay = None
+        self.pos = (0, 0)
+        self.key = None
+        self.compositions = 0
+
+    def hit(self, pos):
+        for name, rect in self.buttons.items():
+            if rect.collidepoint(pos):
+                return name
+        return None
+
+    def compose(self, labels):
+        canvas = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        for path, pos in self.images:
+            canvas.blit(assets.load(path), pos)
+        for rect in self.buttons.values():
+            pygame.draw.rect(canvas, WHITE, rect)
+        for label, pos in self.button_labels:
+            canvas.blit(self.text.render(label, BLACK), pos)
+        for label, color, pos in labels:
+            canvas.blit(self.text.render(label, color), pos)
+        bounds = canvas.get_bounding_rect()
+        self.overlay = canvas.subsurface(bounds).copy()
+        self.pos = bounds.topleft
+        self.compositions += 1
+
+    #(surface, pos) to draw this frame
+    def layer(self):
+        labels = tuple(self.labels()) if self.labels is not None else ()
+        if self.overlay is None or labels != self.key:
+            self.compose(labels)
+            self.key = labels
+        return self.overlay, self.pos
+
+def menu_screen(text):
+    return Screen(text, images=[("img/title.png", (350, 200))], buttons=[
+        ("start", (WIDTH // 2 - 80, HEIGHT // 2 + 20, 160, 40), "Start", (WIDTH // 2 - 28, HEIGHT // 2 + 30)),
+        ("exit", (WIDTH // 2 - 80, HEIGHT // 2 + 80, 160, 40), "Exit", (WIDTH // 2 - 27, HEIGHT // 2 + 90)),
+    ])
+
+def difficulty_screen(text):
+    buttons = []
+    for i, difficulty in enumerate(["easy", "normal", "hard"]):
+        rect = pygame.Rect(WIDTH // 2 - 80, HEIGHT // 2 - 150 + 50 * i, 160, 40)
+        buttons.append((difficulty, rect, difficulty.capitalize(), (rect.x + 40, rect.y + 10)))
+    return Screen(text, buttons=buttons)
+
+#`score` returns the score to show, the screen is recomposed when it changes
+def game_over_screen(text, score):
+    return Screen(text, images=[("img/gameover.png", (550, 200))], buttons=[
+        ("retry", (WIDTH // 2 - 80, HEIGHT // 2 + 50, 150, 40), "Retry", (WIDTH // 2 - 35, HEIGHT // 2 + 60)),
+        ("menu", (WIDTH // 2 - 80, HEIGHT // 2 + 100, 150, 40), "Main Menu", (WIDTH // 2 - 70, HEIGHT // 2 + 110)),
+        ("exit", (WIDTH // 2 - 80, HEIGHT // 2 + 150, 150, 40), "Exit", (WIDTH // 2 - 30, HEIGHT // 2 + 160)),
+    ], labels=lambda: [(f"Score: {score()}", WHITE, (WIDTH // 2 - 60, HEIGHT // 2))])
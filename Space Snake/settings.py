@@ -0,0 +1,40 @@
+import os
+import sys
+
+# Constants
+WIDTH, HEIGHT = 1500, 600
+FPS = 60
+SNAKE_SIZE = 80
+STAR_SIZE = 40
+DEBRIS_SIZE = 70
+OBSTACLE_SIZE = 100
+SCROLL_SPEED = 5
+GAME_STATE_PLAYING = 1
+GAME_STATE_GAME_OVER = 2
+GAME_STATE_DIFFICULTY_SELECTION = 3
+GAME_STATE_MENU = 0
+
+# Colors
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+# Assets are resolved next to the game files, not the working directory.
+# PyInstaller builds unpack them into sys._MEIPASS
+BASE_DIR = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+
+def asset_path(path):
+    return os.path.join(BASE_DIR, path)
+
+#Difficulty selection function
+def get_gravity_constant(selected_difficulty):
+    difficulty_constants = {
+        "easy":     0.000000000000001,
+        "normal":   0.0000000001,
+        "hard":     0.000001,
+    }
+    return difficulty_constants.get(selected_difficulty, 0.00000000000001)
+
+#Headless runs (CI, benchmarks) use the SDL dummy drivers
+def use_dummy_drivers():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
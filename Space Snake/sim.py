@@ -0,0 +1,292 @@
+import random
+import pygame
+from settings import (WIDTH, HEIGHT, STAR_SIZE, SNAKE_SIZE, SCROLL_SPEED, GAME_STATE_PLAYING, GAME_STATE_GAME_OVER,
+                      get_gravity_constant)
+from lagrange import BarycentricInterpolator
+from field import GravityField
+from sprites import Snake, Star, Obstacle, Debris
+from lanes import LaneIndex
+from spatial import SpatialHash, collision_bounds
+from collision import COLLISION_MODES
+from entities import EntityStore
+from pool import SpritePool
+from waves import SpawnScheduler, SPAWN_BUDGET
+
+#Velocity set by each movement key, (axis, value)
+KEY_VELOCITY = {
+    pygame.K_w: ("vel_y", -2),
+    pygame.K_s: ("vel_y", 2),
+    pygame.K_a: ("vel_x", -4),
+    pygame.K_d: ("vel_x", 4),
+}
+
+#Sprites built up front per pool, enough for a typical session
+POOL_PREWARM = {"stars": 16, "obstacles": 4, "debris": 4}
+
+#Fastest obstacles and debris drift on each axis under gravity, pixels per tick
+FIELD_MAX_SPEED = 2
+
+# Headless gameplay core
+#
+# Owns every gameplay object and advances one fixed 1/FPS tick per step().
+# All randomness goes through self.rng, so the same seed and the same actions
+# always play out the same session. Nothing here renders or touches the
+# display, the pygame loop in game.py only draws what is in all_sprites.
+# Stars, obstacles and debris come from pools and go back to them when
+# collected or when the session resets. While they are in play their
+# positions live in an EntityStore, call sync() before drawing them.
+#
+# What spawns and when comes from a wave profile, the difficulty's own
+# unless `waves` names another one (a stress test). Spawns are queued and
+# done at most `spawn_budget` per tick.
+#
+# `collision` picks the narrow phase from COLLISION_MODES: exact masks by
+# default, or the original rects and circles.
+#
+# With `field_pull` obstacles and debris are pulled by gravity too, through
+# the cached field. The snake always uses the exact interpolation.
+#
+# One sim runs about 20k ticks/s on one core (bench/bench_sim.py). A
+# random-input session lasts ~1000 ticks, so that is ~20 sessions/s, not
+# thousands. The cost is spread over the per-tick Lagrange sum the game's
+# gravity is defined by, the sprite bookkeeping and the collision queries.
+# Balance runs that need more sessions use batch.BatchSim, which gives up
+# sprites and exact replays of these sessions for ~200k game ticks/s.
+class SpaceSnakeSim:
+    def __init__(self, difficulty="normal", seed=None, prewarm=None, field_pull=False, waves=None,
+                 spawn_budget=SPAWN_BUDGET, collision="mask"):
+        if collision not in COLLISION_MODES:
+            raise ValueError(f"Unknown collision mode {collision!r}, expected one of {list(COLLISION_MODES)}")
+        self.all_sprites = pygame.sprite.Group()
+        self.stars = pygame.sprite.Group()
+        self.obstacles = pygame.sprite.Group()
+        self.debris = pygame.sprite.Group()
+        self.gravity = BarycentricInterpolator(span=WIDTH + 2 * STAR_SIZE)
+        self.field = GravityField(self.gravity)
+        self.field_pull = field_pull
+        #Heights obstacles can spawn at without overlapping a star
+        self.lanes = LaneIndex(0, HEIGHT - SNAKE_SIZE)
+        #Broad phase for collisions with the snake
+        self.grid = SpatialHash()
+        self.collision = collision
+        self.collide_star, self.collide_obstacle, self.collide_debris = COLLISION_MODES[collision]
+        #Positions of everything that scrolls, moved as arrays
+        self.entities = EntityStore()
+        self.waves = waves
+        self.spawner = SpawnScheduler(waves or difficulty, spawn_budget)
+
+        #Sprites keep a reference to the RNG, reset() reseeds it in place
+        self.rng = random.Random(seed)
+        self.snake = Snake(WIDTH // 2, HEIGHT // 2)
+        sizes = dict(POOL_PREWARM, **(prewarm or {}))
+        self.pools = {
+            "stars": SpritePool(lambda: Star(self.rng, self.lanes), sizes["stars"]),
+            "obstacles": SpritePool(lambda: Obstacle(self.rng, self.lanes), sizes["obstacles"]),
+            "debris": SpritePool(lambda: Debris(self.rng), sizes["debris"]),
+        }
+        self.obstacles_list = []
+        self.debris_list = []
+        self.reset(difficulty, seed)
+
+    def reset(self, difficulty=None, seed=None):
+        if difficulty is not None:
+            self.difficulty = difficulty
+        self.seed = seed
+        self.rng.seed(seed)
+        self.gravity_constant = get_gravity_constant(self.difficulty)
+        self.spawner.load(self.waves or self.difficulty)
+
+        #Hand every sprite of the last session back to its pool
+        for name, group in (("stars", self.stars), ("obstacles", self.obstacles), ("debris", self.debris)):
+            for sprite in group:
+                self.pools[name].release(sprite)
+        self.all_sprites.empty()
+        self.stars.empty()
+        self.obstacles.empty()
+        self.debris.empty()
+        self.gravity.clear()
+        self.lanes.clear()
+        self.grid.clear()
+        self.entities.clear()
+        self.spawner.clear()
+
+        self.snake.spawn(WIDTH // 2, HEIGHT // 2)
+        self.all_sprites.add(self.snake)
+
+        #Initial stars, obstacles and debris
+        self.obstacles_list.clear()
+        self.debris_list.clear()
+        self.spawner.start()
+        self.spawn_queued()
+
+        self.score = 0
+        self.ticks = 0
+        self.time = 0
+        self.result_x = 0
+        self.result_y = 0
+        self.force_x = 0
+        self.force_y = 0
+        self.state = GAME_STATE_PLAYING
+
+    @property
+    def playing(self):
+        return self.state == GAME_STATE_PLAYING
+
+    def add_sprite(self, sprite, group):
+        group.add(sprite)
+        self.all_sprites.add(sprite)
+        sprite.grid = self.grid
+        self.grid.insert(sprite)
+        self.entities.add(sprite)
+
+    def add_star(self):
+        star = self.pools["stars"].acquire()
+        self.add_sprite(star, self.stars)
+        return star
+
+    def add_obstacle(self):
+        obstacle = self.pools["obstacles"].acquire()
+        self.obstacles_list.append(obstacle)
+        self.add_sprite(obstacle, self.obstacles)
+        return obstacle
+
+    def add_debris(self):
+        debris = self.pools["debris"].acquire()
+        self.debris_list.append(debris)
+        self.add_sprite(debris, self.debris)
+        return debris
+
+    #Apply (KEYDOWN/KEYUP, key) pairs to the snake
+    def handle_actions(self, actions):
+        for event_type, key in actions:
+            axis = KEY_VELOCITY.get(key)
+            if axis is None:
+                continue
+            name, value = axis
+            if event_type == pygame.KEYDOWN:
+                setattr(self.snake, name, value)
+            elif event_type == pygame.KEYUP:
+                setattr(self.snake, name, 0)
+
+    def apply_gravity(self):
+        #Data points, the snake plus every star
+        points = {self.snake: (self.snake.rect.x, self.snake.rect.y)}
+        xs, ys = self.entities.x.tolist(), self.entities.y.tolist()
+        points.update((star, (xs[star.slot], ys[star.slot])) for star in self.stars)
+        self.gravity.sync(points)
+
+        #Lagrange implementation where gravity is influenced by data points
+        self.result_x, self.result_y = self.gravity.evaluate((self.snake.rect.x, self.snake.rect.y))
+        self.force_x = self.gravity_constant * self.result_x
+        self.force_y = self.gravity_constant * self.result_y
+
+        #Apply gravitational force to the snake
+        self.snake.vel_x += self.force_x
+        self.snake.vel_y += self.force_y
+
+    #Accelerate obstacles and debris by the field at their position
+    def apply_field(self):
+        slots = self.entities.drifters()
+        if not len(slots):
+            return
+        fx, fy = self.field.sample(self.entities.x[slots], self.entities.y[slots])
+        self.entities.accelerate(slots, self.gravity_constant * fx, self.gravity_constant * fy, FIELD_MAX_SPEED)
+
+    def collect_stars(self):
+        collisions = self.grid.collide(self.snake, self.stars, True, self.collide_star)
+        if not collisions:
+            return
+        for star in collisions:
+            self.pools["stars"].release(star)
+        self.score += 1
+
+        #A new star takes the collected one's place straight away
+        star = self.add_star()
+        star.reset_position()
+        star.update()
+        star.moved()
+
+        #Whatever the score brings comes over the next ticks
+        self.spawner.wave(self.score)
+
+    #Do as many queued spawns as the budget allows this tick
+    def spawn_queued(self):
+        job = self.spawner.next()
+        while job is not None:
+            kind, target = job
+            if kind == "star":
+                self.add_star().reset_position()
+            elif kind == "extra_star":
+                #Starts in the top left corner, a new data point for Lagrange interpolation
+                self.add_star()
+            elif kind == "obstacle":
+                self.add_obstacle()
+            elif kind == "relocate":
+                self.spawner.push_front([("place", obstacle) for obstacle in self.obstacles_list])
+            elif kind == "place":
+                #Move the obstacle away from the stars
+                self.entities.sync([target])
+                target.set_y(target.random_y())
+            elif kind == "debris":
+                self.add_debris()
+            else:
+                raise ValueError(f"Unknown spawn kind {kind!r}")
+            job = self.spawner.next()
+        self.spawner.end_frame()
+
+    def check_hazards(self):
+        #If player touches an obstacle, the game is over
+        if self.grid.collide(self.snake, self.obstacles, False, self.collide_obstacle):
+            self.state = GAME_STATE_GAME_OVER
+
+        #Player touched debris, deduct a point
+        debris_collisions = self.grid.collide(self.snake, self.debris, False, self.collide_debris)
+        if debris_collisions:
+            self.score -= 1
+            if self.score < 0:
+                self.state = GAME_STATE_GAME_OVER
+            for debris_item in debris_collisions:
+                debris_item.reset_position()
+
+    #Bring every sprite rect up to date, for drawing
+    def sync(self):
+        self.entities.sync()
+
+    def timer(self):
+        self.ticks += 1
+        if self.ticks > 100:
+            self.time = self.ticks // 100
+
+    # Advance the game by one tick, returns the game state afterwards
+    #
+    # `clock` is optional instrumentation, anything with a mark(phase) method
+    # that records the time since its previous mark.
+    def step(self, actions=(), clock=None):
+        if not self.playing:
+            return self.state
+        self.handle_actions(actions)
+        self.apply_gravity()
+        if self.field_pull:
+            self.apply_field()
+        if clock is not None:
+            clock.mark("gravity")
+        #Only what the snake can touch needs an up to date rect
+        self.entities.sync(self.grid.query(collision_bounds(self.snake)))
+        self.collect_stars()
+        if clock is not None:
+            clock.mark("collision")
+        self.spawn_queued()
+        if clock is not None:
+            clock.mark("spawn")
+        self.check_hazards()
+        if clock is not None:
+            clock.mark("collision")
+        if self.playing:
+            self.timer()
+        #Scroll the grid first so sprites respawning during update land in the right cells
+        self.grid.scroll(-SCROLL_SPEED)
+        self.snake.update()
+        self.entities.step(self.grid)
+        if clock is not None:
+            clock.mark("update")
+        return self.state
@@ -0,0 +1,124 @@
+#Area a sprite can collide over: its rect, widened to a square of
+#half-size `extent` around the center for circles and spinning sprites
+def collision_bounds(sprite):
+    rect = sprite.rect
+    extent = getattr(sprite, "extent", 0)
+    if extent:
+        x, y = rect.center
+        return rect.union((x - extent, y - extent, 2 * extent, 2 * extent))
+    return rect
+
+# Uniform-grid spatial hash
+#
+# Stars, obstacles and debris all scroll left at the same speed, so cells
+# are kept in a scrolling world frame: scroll() moves the frame and sprites
+# keep their cells until they respawn or move on their own, which is when
+# update() has to be called. Results come back in insertion order so they
+# match what a linear scan over the groups would return.
+class SpatialHash:
+    def __init__(self, cell_size=100):
+        self.cell_size = cell_size
+        self.offset = 0
+        self.seq = 0
+        self.cells = {}
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, sprite):
+        return sprite in self.entries
+
+    def clear(self):
+        self.offset = 0
+        self.cells.clear()
+        self.entries.clear()
+
+    def scroll(self, dx):
+        self.offset += dx
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        x = rect.x - self.offset
+        return (x // size, (x + rect.width - 1) // size,
+                rect.y // size, (rect.bottom - 1) // size)
+
+    def cells_for(self, rect):
+        x0, x1, y0, y1 = self.cell_range(rect)
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+    def insert(self, sprite):
+        self.seq += 1
+        keys = self.cells_for(collision_bounds(sprite))
+        self.entries[sprite] = (self.seq, keys)
+        for key in keys:
+            self.cells.setdefault(key, set()).add(sprite)
+
+    def remove(self, sprite):
+        entry = self.entries.pop(sprite, None)
+        if entry is None:
+            return
+        for key in entry[1]:
+            cell = self.cells[key]
+            cell.discard(sprite)
+            if not cell:
+                del self.cells[key]
+
+    def update(self, sprite):
+        entry = self.entries.get(sprite)
+        if entry is None:
+            return
+        keys = self.cells_for(collision_bounds(sprite))
+        if keys == entry[1]:
+            return
+        for key in entry[1]:
+            cell = self.cells[key]
+            cell.discard(sprite)
+            if not cell:
+                del self.cells[key]
+        self.entries[sprite] = (entry[0], keys)
+        for key in keys:
+            self.cells.setdefault(key, set()).add(sprite)
+
+    #Sprites whose cells overlap a rect, in insertion order
+    def query(self, rect):
+        found = set()
+        cells = self.cells
+        x0, x1, y0, y1 = self.cell_range(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    found |= cell
+        if len(found) < 2:
+            return list(found)
+        return sorted(found, key=lambda sprite: self.entries[sprite][0])
+
+    #Candidate pairs of sprites sharing a cell, each pair once
+    def pairs(self):
+        seen = set()
+        for cell in self.cells.values():
+            if len(cell) < 2:
+                continue
+            members = sorted(cell, key=lambda sprite: self.entries[sprite][0])
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    seen.add((a, b))
+        return seen
+
+    #Drop-in for pygame.sprite.spritecollide that only tests nearby sprites
+    def collide(self, sprite, group, dokill=False, collided=None):
+        hits = []
+        for other in self.query(collision_bounds(sprite)):
+            if not group.has_internal(other):
+                continue
+            if collided is None:
+                hit = sprite.rect.colliderect(other.rect)
+            else:
+                hit = collided(sprite, other)
+            if hit:
+                hits.append(other)
+        if dokill:
+            for other in hits:
+                other.kill()
+        return hits
@@ -0,0 +1,176 @@
+import math
+import pygame
+from settings import WIDTH, HEIGHT, SNAKE_SIZE, STAR_SIZE, DEBRIS_SIZE, OBSTACLE_SIZE, SCROLL_SPEED
+from assets import assets, rotations
+
+# Base for the scrolling sprites
+#
+# Keeps an optional spatial hash and entity store in step whenever the
+# sprite jumps (respawns or is re-placed) or is killed. Plain scrolling
+# needs no update. Inside a store the rect only follows the store's
+# columns when the store syncs it.
+class Entity(pygame.sprite.Sprite):
+    grid = None
+    store = None
+    extent = 0
+    rotates = False
+    #Drifts with the gravity field when the sim turns that on
+    pulled = False
+
+    def moved(self):
+        if self.store is not None:
+            self.store.pull(self)
+        if self.grid is not None:
+            self.grid.update(self)
+
+    def kill(self):
+        super().kill()
+        if self.grid is not None:
+            self.grid.remove(self)
+        if self.store is not None:
+            self.store.remove(self)
+
+    #Store columns (x, y, angle, spin, reach), plain sprites are their rect's top left
+    def position(self):
+        return self.rect.x, self.rect.y, 0, 0, self.rect.width
+
+# Snake class
+class Snake(pygame.sprite.Sprite):
+    def __init__(self, x, y):
+        super().__init__()
+        self.image = assets.load("img/snake.png", (SNAKE_SIZE, SNAKE_SIZE))
+        self.mask = assets.mask("img/snake.png", (SNAKE_SIZE, SNAKE_SIZE))
+        self.rect = self.image.get_rect()
+        self.radius = SNAKE_SIZE // 2
+        self.extent = self.radius
+        self.spawn(x, y)
+
+    def spawn(self, x, y):
+        self.rect.center = (x, y)
+        self.vel_x = 0
+        self.vel_y = 0
+
+    def update(self):
+        # Update position within screen bounds
+        self.rect.x = max(0, min(WIDTH - SNAKE_SIZE, self.rect.x + self.vel_x))
+        self.rect.y = max(0, min(HEIGHT - SNAKE_SIZE, self.rect.y + self.vel_y))
+
+# Star class
+class Star(Entity):
+    def __init__(self, rng, lanes=None):
+        super().__init__()
+        self.rng = rng
+        self.lanes = lanes
+        self.image = assets.load("img/star.png", (STAR_SIZE, STAR_SIZE))
+        self.mask = assets.mask("img/star.png", (STAR_SIZE, STAR_SIZE))
+        self.rect = self.image.get_rect()
+
+    #(Re)start the sprite's life, new and pooled sprites both go through here
+    def spawn(self):
+        self.rect.topleft = (0, 0)
+        self.block_lane()
+
+    #Obstacles may not spawn strictly inside the star's vertical span
+    def block_lane(self):
+        if self.lanes is not None:
+            self.lanes.block(self, self.rect.y + 1, self.rect.y + STAR_SIZE)
+
+    def kill(self):
+        super().kill()
+        if self.lanes is not None:
+            self.lanes.unblock(self)
+
+    def reset_position(self):
+        self.rect.center = (self.rng.randint(WIDTH, WIDTH + STAR_SIZE), self.rng.randint(0, HEIGHT - STAR_SIZE))
+        self.block_lane()
+        self.moved()
+
+    def update(self):
+        self.rect.x -= SCROLL_SPEED  # Move to the left
+        if self.rect.right < 0:
+            self.reset_position()
+
+#Obstacle class
+class Obstacle(Entity):
+    image_path = "img/obstacle1_l.png"
+    rotates = True
+    pulled = True
+
+    def __init__(self, rng, lanes):
+        super().__init__()
+        self.rng = rng
+        self.lanes = lanes
+        self.image, self.mask = rotations.get(self.image_path, 0)
+        self.rect = self.image.get_rect()
+        self.radius = OBSTACLE_SIZE // 2
+        #Covers the image at any rotation
+        self.extent = math.ceil(math.hypot(*self.rect.size) / 2)
+
+    def spawn(self):
+        self.rotation_speed = self.rng.uniform(-0.1, 0.1)  # Random rotation speed
+        self.reset_position()
+
+    def random_y(self):
+        # Random height, avoiding overlap with stars
+        y = self.lanes.random_free(self.rng)
+        if y is None:
+            # If there's no valid y-range (stars cover the entire height), choose a random position
+            y = self.rng.randint(0, HEIGHT - SNAKE_SIZE)
+        return y
+
+    def set_y(self, y):
+        self.rect.y = y
+        self.center = self.rect.center
+        self.moved()
+
+    def reset_position(self):
+        # Reset rotation angle
+        self.angle = 0
+        self.image, self.mask = rotations.get(self.image_path, self.angle)
+        self.rect = self.image.get_rect()
+        # Start from the right side
+        self.rect.x = WIDTH
+        self.set_y(self.random_y())
+
+    #The center is the real position, the store keeps it with the angle
+    def position(self):
+        return self.center[0], self.center[1], self.angle, self.rotation_speed, 0
+
+    def place(self, x, y, angle):
+        self.center = (x, y)
+        self.angle = angle
+        self.image, self.mask = rotations.get(self.image_path, self.angle)
+        self.rect = self.image.get_rect(center=self.center)
+
+    def update(self):
+        #Rebuilding the rect from the center never drifts
+        self.place(self.center[0] - SCROLL_SPEED, self.center[1], self.angle + self.rotation_speed)  # Move to the left
+
+        if self.rect.right < 0:
+            self.reset_position()
+
+#Debris class
+class Debris(Entity):
+    pulled = True
+
+    def __init__(self, rng):
+        super().__init__()
+        self.rng = rng
+        self.original_image = assets.load("img/debris.png")
+        self.image = self.original_image
+        self.mask = assets.mask("img/debris.png")
+        self.rect = self.image.get_rect()
+        self.radius = DEBRIS_SIZE // 2
+        self.extent = self.radius
+
+    def spawn(self):
+        self.reset_position()
+
+    def reset_position(self):
+        self.rect.center = (self.rng.randint(WIDTH, WIDTH + DEBRIS_SIZE), self.rng.randint(0, HEIGHT - DEBRIS_SIZE))
+        self.moved()
+
+    def update(self):
+        self.rect.x -= SCROLL_SPEED  # Move to the left
+        if self.rect.right < 0:
+            self.reset_position()
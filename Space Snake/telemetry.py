@@ -0,0 +1,112 @@
+import queue
+import threading
+import numpy as np
+
+MAGIC = b"SSTEL1\n"
+
+#One record per sampled tick, followed by `nodes` (x, y) float32 pairs
+RECORD = np.dtype([
+    ("tick", "<i4"),
+    ("nodes", "<i4"),
+    ("snake_x", "<f8"),
+    ("snake_y", "<f8"),
+    ("result_x", "<f8"),
+    ("result_y", "<f8"),
+    ("force_x", "<f8"),
+    ("force_y", "<f8"),
+])
+
+# Physics telemetry recorder
+#
+# record() packs the interpolation nodes, Lagrange results and applied
+# gravity of one tick into bytes and hands them to a writer thread through
+# a bounded queue. The game thread never waits on the file: when the queue
+# is full the sample is dropped and counted instead. The file is opened
+# here so a bad path fails on the game thread; if a write fails later the
+# writer stops, keeps the error in `error` and every sample after that is
+# dropped.
+class TelemetryRecorder:
+    def __init__(self, path, every=1, backlog=1024):
+        self.path = path
+        self.every = max(1, every)
+        self.queue = queue.Queue(backlog)
+        self.recorded = 0
+        self.dropped = 0
+        self.error = None
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.thread = threading.Thread(target=self.write_loop, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def write_loop(self):
+        try:
+            with self.file as f:
+                while True:
+                    chunk = self.queue.get()
+                    if chunk is None:
+                        break
+                    f.write(chunk)
+        except OSError as error:
+            self.error = error
+
+    def record(self, sim):
+        if sim.ticks % self.every:
+            return
+        if not self.thread.is_alive():
+            self.dropped += 1
+            return
+        nodes = sim.gravity.node_array()
+        #Where the snake was when gravity was evaluated
+        snake_x, snake_y = sim.gravity.nodes.get(sim.snake, (0, 0))
+        snake_x += sim.gravity.offset
+        header = np.array([(sim.ticks, len(nodes), snake_x, snake_y,
+                            sim.result_x, sim.result_y, sim.force_x, sim.force_y)], dtype=RECORD)
+        try:
+            self.queue.put_nowait(header.tobytes() + nodes.astype("<f4").tobytes())
+            self.recorded += 1
+        except queue.Full:
+            self.dropped += 1
+
+    #Waits for the queued samples to be written, unless the writer has died
+    def close(self):
+        while self.thread.is_alive():
+            try:
+                self.queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self.thread.join()
+
+#Load a telemetry file into NumPy arrays
+#
+#Returns the per-tick records (a structured array with the RECORD fields),
+#all nodes as one (total, 2) array and the offset of each tick's first node.
+def load(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a Space Snake telemetry file")
+    records = []
+    nodes = []
+    pos = len(MAGIC)
+    while pos < len(data):
+        record = np.frombuffer(data, RECORD, 1, pos)[0]
+        pos += RECORD.itemsize
+        count = int(record["nodes"])
+        nodes.append(np.frombuffer(data, "<f4", count * 2, pos).reshape(count, 2))
+        pos += count * 8
+        records.append(record)
+    records = np.array(records, dtype=RECORD)
+    offsets = np.cumsum(records["nodes"], dtype=np.int64) - records["nodes"]
+    nodes = np.concatenate(nodes) if nodes else np.zeros((0, 2), dtype=np.float32)
+    return {"records": records, "nodes": nodes, "offsets": offsets}
+
+if __name__ == "__main__":
+    import sys
+    session = load(sys.argv[1])
+    records = session["records"]
+    print(f"{len(records)} ticks, {len(session['nodes'])} nodes")
+    #A session closed before a run started has no records
+    if len(records):
+        for field in ["result_x", "result_y", "force_x", "force_y"]:
+            print(f"{field:>9}: min {records[field].min():.6g} max {records[field].max():.6g} mean {records[field].mean():.6g}")
@@ -0,0 +1,109 @@
+import math
+from collections import deque
+from functools import lru_cache
+
+#Jobs done per tick at most, 0 does everything as soon as it is queued
+SPAWN_BUDGET = 16
+
+# Wave profiles
+#
+# What a session spawns. "start" is queued when the session begins, each
+# (every, kinds) rule queues its kinds whenever the player scores a multiple
+# of `every`. Kinds, each one job:
+#   star        a star coming in from the right edge
+#   extra_star  a star starting in the top left corner
+#   obstacle    a new obstacle
+#   relocate    move every obstacle away from the stars, one job per obstacle
+#   debris      a new piece of debris
+STANDARD_WAVES = {
+    "start": ["star"] * 5 + ["obstacle", "debris"],
+    "rules": [(30, ["extra_star"] * 3), (25, ["obstacle", "relocate"]), (20, ["debris"])],
+}
+
+#Stress tests, thousands of entities streaming in from the right edge
+def stress_waves(count):
+    return {
+        "start": ["star"] * 5 + ["obstacle", "debris"] * (count // 2),
+        "rules": STANDARD_WAVES["rules"] + [(1, ["debris"] * (count // 100))],
+    }
+
+WAVE_PROFILES = {
+    "easy": STANDARD_WAVES,
+    "normal": STANDARD_WAVES,
+    "hard": STANDARD_WAVES,
+    "stress-1000": stress_waves(1000),
+    "stress-5000": stress_waves(5000),
+}
+
+# Kinds queued at each score, precomputed for a profile. Rules repeat with
+# the least common multiple of their periods, so one period covers every
+# score, entry 0 included.
+@lru_cache(maxsize=None)
+def wave_table(profile):
+    rules = WAVE_PROFILES[profile]["rules"]
+    period = math.lcm(*(every for every, _ in rules)) if rules else 1
+    return tuple(tuple(kind for every, kinds in rules if score % every == 0 for kind in kinds)
+                 for score in range(period))
+
+# Spawn scheduler
+#
+# Queues the jobs of a wave profile and hands them out a few per tick, so
+# a big wave is spread over the next frames instead of landing on the frame
+# the player scores. Jobs are (kind, target) pairs, the sim does them in
+# queue order. After each tick `last_done` is how many jobs it did and
+# `deferred` how many were still left waiting.
+class SpawnScheduler:
+    def __init__(self, profile="normal", budget=SPAWN_BUDGET):
+        self.budget = budget
+        self.queue = deque()
+        self.load(profile)
+        self.clear()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def load(self, profile):
+        if profile not in WAVE_PROFILES:
+            raise ValueError(f"Unknown wave profile {profile!r}, expected one of {list(WAVE_PROFILES)}")
+        self.profile = profile
+        self.table = wave_table(profile)
+
+    def clear(self):
+        self.queue.clear()
+        self.done = 0
+        self.last_done = 0
+        self.deferred = 0
+        self.total_done = 0
+        self.total_deferred = 0
+        self.max_deferred = 0
+        self.frames = 0
+
+    def start(self):
+        self.queue.extend((kind, None) for kind in WAVE_PROFILES[self.profile]["start"])
+
+    #The player reached `score`
+    def wave(self, score):
+        self.queue.extend((kind, None) for kind in self.table[score % len(self.table)])
+
+    #Jobs to do before anything already queued
+    def push_front(self, jobs):
+        self.queue.extendleft(reversed(jobs))
+
+    #Next job this tick, None once the budget is spent or nothing is queued
+    def next(self):
+        if not self.queue or (self.budget and self.done >= self.budget):
+            return None
+        self.done += 1
+        return self.queue.popleft()
+
+    def end_frame(self):
+        self.deferred = len(self.queue)
+        self.total_done += self.done
+        self.total_deferred += self.deferred
+        self.max_deferred = max(self.max_deferred, self.deferred)
+        self.frames += 1
+        self.last_done, self.done = self.done, 0
+
+    def stats(self):
+        return {"done": self.total_done, "max_deferred": self.max_deferred,
+                "mean_deferred": self.total_deferred / self.frames if self.frames else 0.0}